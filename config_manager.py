@@ -5,12 +5,26 @@
 负责应用程序设置的保存、加载和管理
 """
 
+import contextlib
+import copy
 import json
 import os
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """一次读取得到的只读配置快照，供单次操作内复用"""
+    
+    __slots__ = ('custom_rules', 'type_mapping', 'recent_sources', 'recent_targets')
+    
+    custom_rules: Tuple[Dict[str, Any], ...]
+    type_mapping: Dict[str, List[str]]
+    recent_sources: Tuple[str, ...]
+    recent_targets: Tuple[str, ...]
+
 class ConfigManager:
     """配置管理器类"""
     
@@ -18,6 +32,14 @@ class ConfigManager:
         self.config_file = Path.home() / '.file_classifier_config.json'
         self.default_config = self._get_default_config()
         
+        # 配置快照缓存，每次保存配置时失效
+        self._version = 0
+        self._snapshot = None
+        self._snapshot_version = -1
+        
+        # 解析后的配置缓存：(修改时间, 文件大小, 配置)，文件变化或保存配置时失效
+        self._cache = None
+        
     def _get_default_config(self) -> Dict[str, Any]:
         """获取默认配置"""
         return {
@@ -119,7 +141,17 @@ class ConfigManager:
     def load_config(self) -> Dict[str, Any]:
         """加载配置文件"""
         try:
-            if self.config_file.exists():
+            try:
+                stat = os.stat(self.config_file)
+            except FileNotFoundError:
+                stat = None
+            
+            if stat is not None:
+                cache = self._cache
+                if cache is not None and cache[0] == stat.st_mtime_ns and cache[1] == stat.st_size:
+                    # 文件未变化，返回缓存的副本（调用方可能修改返回值）
+                    return copy.deepcopy(cache[2])
+                
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     config = json.load(f)
                 
@@ -129,6 +161,7 @@ class ConfigManager:
                 # 验证配置
                 validated_config = self._validate_config(merged_config)
                 
+                self._cache = (stat.st_mtime_ns, stat.st_size, copy.deepcopy(validated_config))
                 return validated_config
             else:
                 # 如果配置文件不存在，创建默认配置文件
@@ -141,6 +174,8 @@ class ConfigManager:
             
     def save_config(self, config: Dict[str, Any]) -> bool:
         """保存配置文件"""
+        self._version += 1
+        self._cache = None
         try:
             # 验证配置
             validated_config = self._validate_config(config)
@@ -148,9 +183,18 @@ class ConfigManager:
             # 确保配置目录存在
             self.config_file.parent.mkdir(parents=True, exist_ok=True)
             
-            # 保存配置
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(validated_config, f, ensure_ascii=False, indent=2)
+            # 先写临时文件再原子替换，避免写到一半时损坏配置文件
+            tmp_file = self.config_file.with_name(self.config_file.name + '.tmp')
+            data = json.dumps(validated_config, ensure_ascii=False, indent=2).encode('utf-8')
+            try:
+                with open(tmp_file, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_file, self.config_file)
+            except BaseException:
+                # 写入或替换失败时不留下临时文件
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_file)
+                raise
             
             return True
             
@@ -197,6 +241,19 @@ class ConfigManager:
             
         return config
         
+    def snapshot(self) -> ConfigSnapshot:
+        """获取配置快照，只读取一次配置文件；配置未保存过则复用上次的快照"""
+        if self._snapshot is None or self._snapshot_version != self._version:
+            config = self.load_config()
+            self._snapshot = ConfigSnapshot(
+                custom_rules=tuple(config.get('custom_rules', [])),
+                type_mapping=config.get('file_type_mapping', {}),
+                recent_sources=tuple(config.get('recent_sources', [])),
+                recent_targets=tuple(config.get('recent_targets', []))
+            )
+            self._snapshot_version = self._version
+        return self._snapshot
+        
     def get_setting(self, key: str, default: Any = None) -> Any:
         """获取单个设置项"""
         config = self.load_config()
@@ -208,6 +265,14 @@ class ConfigManager:
         config[key] = value
         return self.save_config(config)
         
+    def patch_config(self, changes: Dict[str, Any]) -> bool:
+        """只更新发生变化的顶层设置项，没有变化时不写文件"""
+        if not changes:
+            return True
+        config = self.load_config()
+        config.update(changes)
+        return self.save_config(config)
+        
     def get_nested_setting(self, *keys, default: Any = None) -> Any:
         """获取嵌套设置项"""
         config = self.load_config()
@@ -10,7 +10,7 @@ import re
 import mimetypes
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Union
 from collections import defaultdict
 import fnmatch
 
@@ -219,6 +219,12 @@ class HierarchicalFileClassifier:
             ]
         }
         
+        # 预编译文件名模式：每个类别合并为一个正则，避免逐个 re.match 查缓存
+        self._compiled_filename_patterns = {
+            category: re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))
+            for category, patterns in self.filename_patterns.items()
+        }
+        
         # 分类配置
         self.classification_config = {
             'max_files_per_folder': 50,
@@ -295,9 +301,10 @@ class HierarchicalFileClassifier:
         
         return classification_path[:max_depth]
     
-    def _get_primary_type(self, file_path: Path) -> str:
-        """获取文件的主要类型"""
-        extension = file_path.suffix.lower()
+    def _get_primary_type(self, file_path: Union[Path, str]) -> str:
+        """获取文件的主要类型（接受 Path 或路径字符串）"""
+        file_path = os.fspath(file_path)
+        extension = os.path.splitext(file_path)[1].lower()
         
         # 遍历详细类型映射
         for primary_type, subtypes in self.detailed_type_mapping.items():
@@ -305,7 +312,7 @@ class HierarchicalFileClassifier:
                 return primary_type
         
         # 根据MIME类型判断
-        mime_type, _ = mimetypes.guess_type(str(file_path))
+        mime_type, _ = mimetypes.guess_type(file_path)
         if mime_type:
             if mime_type.startswith('image/'):
                 return 'images'
@@ -405,10 +412,9 @@ class HierarchicalFileClassifier:
         """基于文件名模式分类"""
         filename = file_path.name.lower()
         
-        for category, patterns in self.filename_patterns.items():
-            for pattern in patterns:
-                if re.match(pattern, filename):
-                    return category
+        for category, compiled_pattern in self._compiled_filename_patterns.items():
+            if compiled_pattern.match(filename):
+                return category
         return None
     
     def _detect_project_structure(self, file_path: Path) -> Optional[str]:
@@ -613,30 +619,50 @@ class HierarchicalFileClassifier:
             return analysis
         
         file_count_by_type = defaultdict(int)
-        
-        # 分析所有文件
-        for file_path in directory_path.rglob('*'):
-            if file_path.is_file():
+        # 各一级子目录下的文件数，在同一次遍历中统计，不再逐个子目录重新遍历
+        file_count_by_top_dir = defaultdict(int)
+        
+        # 分析所有文件：深度和所属一级子目录随目录一起记录，每个文件不再单独计算相对路径
+        # (目录, 深度, 所属一级子目录名)；与rglob一致，不进入指向目录的符号链接
+        stack = [(str(directory_path), 0, None)]
+        while stack:
+            current_dir, depth, top_dir = stack.pop()
+            try:
+                with os.scandir(current_dir) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, depth + 1, top_dir or entry.name))
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                
                 analysis['total_files'] += 1
                 
                 # 类型分布
-                primary_type = self._get_primary_type(file_path)
+                primary_type = self._get_primary_type(entry.path)
                 analysis['type_distribution'][primary_type] += 1
                 file_count_by_type[primary_type] += 1
                 
                 # 深度分析
-                depth = len(file_path.relative_to(directory_path).parts) - 1
                 analysis['depth_analysis'][depth] += 1
+                if top_dir:
+                    file_count_by_top_dir[top_dir] += 1
         
         # 找出大目录
-        for item in directory_path.iterdir():
-            if item.is_dir():
-                file_count = sum(1 for _ in item.rglob('*') if _.is_file())
-                if file_count > self.classification_config['max_files_per_folder']:
-                    analysis['large_directories'].append({
-                        'path': item.name,
-                        'file_count': file_count
-                    })
+        max_files = self.classification_config['max_files_per_folder']
+        for dir_name, file_count in file_count_by_top_dir.items():
+            if file_count > max_files:
+                analysis['large_directories'].append({
+                    'path': dir_name,
+                    'file_count': file_count
+                })
         
         # 计算推荐的分类深度
         max_type_count = max(file_count_by_type.values()) if file_count_by_type else 0
@@ -7,21 +7,84 @@
 import os
 import shutil
 import json
+import time
+import re
 import fnmatch
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import send2trash
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+def compile_custom_rules(custom_rules: List[Dict]) -> Optional[Tuple[re.Pattern, List[Dict]]]:
+    """把一组自定义规则预编译为 (合并正则, 规则列表)，没有规则时返回None
+
+    模式统一转为小写并规范化后合并为一个正则，分组名 r<下标> 对应规则位置。
+    每次分类只需编译一次，之后每个文件只做一次匹配。
+    """
+    rules = list(custom_rules or ())
+    if not rules:
+        return None
+    regex = re.compile('|'.join(
+        f'(?P<r{i}>{fnmatch.translate(os.path.normcase(rule.get("pattern", "").lower()))})'
+        for i, rule in enumerate(rules)
+    ))
+    return regex, rules
+
+def match_custom_rule(filename: str, compiled_rules: Optional[Tuple[re.Pattern, List[Dict]]]) -> Optional[Dict]:
+    """返回第一条匹配文件名的自定义规则（不区分大小写），compiled_rules 由 compile_custom_rules 生成"""
+    if compiled_rules is None:
+        return None
+    regex, rules = compiled_rules
+    match = regex.match(os.path.normcase(filename.lower()))
+    if match is None:
+        return None
+    return rules[int(match.lastgroup[1:])]
+
+def build_extension_index(type_mapping: Dict[str, List[str]]) -> Dict[str, str]:
+    """由类型映射生成 扩展名 -> 类型 的反向索引，扩展名重复时以先出现的类型为准"""
+    index = {}
+    for type_name, extensions in type_mapping.items():
+        for extension in extensions:
+            index.setdefault(extension, type_name)
+    return index
+
+def month_folder(mtime: float) -> str:
+    """把修改时间转换为“年-月”文件夹名，直接取本地时间字段，不创建datetime也不解析格式串"""
+    tm = time.localtime(mtime)
+    return f'{tm.tm_year}-{tm.tm_mon:02d}'
+
+def _iter_files(directory: str):
+    """用os.scandir递归遍历目录下的所有文件路径，类型判断使用目录读取时缓存的信息
+
+    与Path.rglob一致：不进入指向目录的符号链接，无权限访问的子目录直接跳过。
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except (PermissionError, FileNotFoundError, NotADirectoryError):
+        return
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_files(entry.path)
+            elif entry.is_file():
+                yield entry.path
+        except OSError:
+            continue
+
 class FileClassifier:
     """内存优化的文件分类器核心类"""
     
     __slots__ = ['operation_history', 'max_history', 'history_file', 'default_type_mapping', 
-                 'hierarchical_classifier', 'use_hierarchical']
+                 'hierarchical_classifier', 'use_hierarchical', '_ext_index', '_rule_matcher']
     
     def __init__(self):
         self.operation_history = []
+        # (类型映射, 扩展名反向索引)，映射对象变化时重建
+        self._ext_index = None
+        # (自定义规则列表, 预编译规则)，规则列表对象变化时重建
+        self._rule_matcher = None
         self.max_history = 50  # 最多保存50次操作记录
         self.history_file = Path.home() / '.file_classifier_history.json'
         
@@ -69,18 +132,20 @@ class FileClassifier:
     def classify_files(self, source_path: str, target_path: str, 
                       rules: List[str], operation: str = 'move',
                       custom_rules: List[Dict] = None,
-                      type_mapping: Dict[str, List[str]] = None) -> List[Dict]:
+                      type_mapping: Dict[str, List[str]] = None,
+                      progress_callback: Optional[Callable[[List[Dict]], None]] = None) -> List[Dict]:
         """
         内存优化的批量分类方法
+
+        progress_callback: 每处理完一个文件，用该文件的结果记录列表调用一次
         """
         # 使用生成器避免一次性加载所有文件
         def file_generator(source: Path):
             if source.is_file():
                 yield source
             elif source.is_dir():
-                for f in source.rglob('*'):
-                    if f.is_file():
-                        yield f
+                for path in _iter_files(str(source)):
+                    yield Path(path)
         
         results = []
         current_operation = {
@@ -97,6 +162,10 @@ class FileClassifier:
             target_path = Path(target_path)
             target_path.mkdir(parents=True, exist_ok=True)
             
+            # 启用的自定义规则只预编译一次，每个文件只做一次匹配
+            rule_matcher = compile_custom_rules(
+                [r for r in (custom_rules or []) if r.get('enabled', True)])
+            
             # 使用生成器逐步处理文件
             with ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1)) as executor:
                 futures = []
@@ -105,7 +174,7 @@ class FileClassifier:
                     futures.append(executor.submit(
                         self._process_single_file_lightweight,
                         file_path, target_path, rules, operation,
-                        [r for r in (custom_rules or []) if r.get('enabled', True)],
+                        rule_matcher,
                         type_mapping or self.default_type_mapping
                     ))
                 
@@ -113,6 +182,8 @@ class FileClassifier:
                 for future in as_completed(futures):
                     result = future.result()
                     results.append(result)
+                    if progress_callback:
+                        progress_callback([result])
                     if result.get('success'):
                         # 只保存必要信息到操作历史
                         current_operation['files'].append({
@@ -133,13 +204,13 @@ class FileClassifier:
     
     def _process_single_file_lightweight(self, file_path: Path, target_path: Path, 
                                        rules: List[str], operation: str,
-                                       custom_rules: List[Dict], 
+                                       rule_matcher: Optional[Tuple[re.Pattern, List[Dict]]], 
                                        type_mapping: Dict[str, tuple]) -> Dict:
-        """轻量级单文件处理方法"""
+        """轻量级单文件处理方法，rule_matcher 为预编译的自定义规则"""
         try:
             # 精简的目标路径计算
             target_subdir = self._determine_target_folder_lightweight(
-                file_path, rules, custom_rules, type_mapping
+                file_path, rules, rule_matcher, type_mapping
             )
             final_target = target_path / target_subdir
             final_target.mkdir(parents=True, exist_ok=True)
@@ -187,26 +258,24 @@ class FileClassifier:
             }
     
     def _determine_target_folder_lightweight(self, file_path: Path, rules: List[str],
-                                           custom_rules: List[Dict], 
+                                           rule_matcher: Optional[Tuple[re.Pattern, List[Dict]]], 
                                            type_mapping: Dict[str, tuple]) -> str:
         """轻量级目标路径计算"""
         parts = []
         
         # 自定义规则优先
-        if 'by_custom' in rules and custom_rules:
-            filename = file_path.name.lower()
-            for rule in custom_rules:
-                if fnmatch.fnmatch(filename, rule.get('pattern', '').lower()):
-                    return rule.get('target_folder', '')
+        if 'by_custom' in rules and rule_matcher:
+            rule = match_custom_rule(file_path.name, rule_matcher)
+            if rule is not None:
+                return rule.get('target_folder', '')
         
         # 其他规则
         if 'by_type' in rules:
-            ext = file_path.suffix.lower()
-            parts.append(next((k for k, v in type_mapping.items() if ext in v), 'others'))
+            parts.append(self._get_file_type(file_path, type_mapping))
             
         if 'by_date' in rules:
             try:
-                parts.append(datetime.fromtimestamp(file_path.stat().st_mtime).strftime('%Y-%m'))
+                parts.append(month_folder(file_path.stat().st_mtime))
             except:
                 pass
                 
@@ -229,14 +298,18 @@ class FileClassifier:
             self.operation_history = self.operation_history[-self.max_history:]
             
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.operation_history, f, separators=(',', ':'), ensure_ascii=False)
+            # 一次性编码后以二进制写入，避免 json.dump 对文本流的多次小块写入
+            data = json.dumps(self.operation_history, separators=(',', ':'),
+                              ensure_ascii=False).encode('utf-8')
+            with open(self.history_file, 'wb') as f:
+                f.write(data)
         except Exception:
             pass
     
     def preview_classification(self, source_path: str, target_path: str, 
                              rules: List[str], custom_rules: List[Dict] = None,
-                             type_mapping: Dict[str, List[str]] = None) -> List[Dict]:
+                             type_mapping: Dict[str, List[str]] = None,
+                             progress_callback: Optional[Callable[[List[Dict]], None]] = None) -> List[Dict]:
         """
         预览分类结果，不实际移动文件
         
@@ -246,6 +319,7 @@ class FileClassifier:
             rules: 启用的分类规则列表
             custom_rules: 自定义规则列表
             type_mapping: 文件类型映射字典
+            progress_callback: 每生成一条预览记录，用该记录组成的列表调用一次
             
         Returns:
             预览结果列表
@@ -290,6 +364,8 @@ class FileClassifier:
                     }
                     
                     results.append(preview_record)
+                    if progress_callback:
+                        progress_callback([preview_record])
                     
                 except Exception as e:
                     error_record = {
@@ -302,6 +378,8 @@ class FileClassifier:
                         'size': 0
                     }
                     results.append(error_record)
+                    if progress_callback:
+                        progress_callback([error_record])
                     
         except Exception as e:
             raise Exception(f"预览过程中发生错误: {str(e)}")
@@ -419,7 +497,7 @@ class FileClassifier:
             if source_path.is_file():
                 files.append(source_path)
             elif source_path.is_dir():
-                files = [f for f in source_path.rglob('*') if f.is_file()]
+                files = [Path(path) for path in _iter_files(str(source_path))]
         except PermissionError:
             pass  # 跳过无权限访问的文件
         return files
@@ -497,20 +575,19 @@ class FileClassifier:
         
     def _get_file_type(self, file_path: Path, type_mapping: Dict[str, List[str]]) -> str:
         """根据文件扩展名获取文件类型"""
-        extension = file_path.suffix.lower()
+        return self._extension_index(type_mapping).get(file_path.suffix.lower(), 'others')
         
-        for type_name, extensions in type_mapping.items():
-            if extension in extensions:
-                return type_name
-                
-        return 'others'
+    def _extension_index(self, type_mapping: Dict[str, List[str]]) -> Dict[str, str]:
+        """获取类型映射的扩展名反向索引，同一映射对象只构建一次"""
+        cached = self._ext_index
+        if cached is None or cached[0] is not type_mapping:
+            cached = self._ext_index = (type_mapping, build_extension_index(type_mapping))
+        return cached[1]
         
     def _get_date_folder(self, file_path: Path) -> str:
         """根据文件修改时间获取日期文件夹"""
         try:
-            mtime = os.path.getmtime(file_path)
-            date = datetime.fromtimestamp(mtime)
-            return date.strftime('%Y-%m')
+            return month_folder(os.path.getmtime(file_path))
         except:
             return '未知日期'
             
@@ -532,18 +609,20 @@ class FileClassifier:
             
     def _apply_custom_rules(self, file_path: Path, custom_rules: List[Dict]) -> Optional[str]:
         """应用自定义规则"""
-        filename = file_path.name.lower()
+        rule = match_custom_rule(file_path.name, self._compiled_custom_rules(custom_rules))
+        return rule['target_folder'] if rule is not None else None
         
-        for rule in custom_rules:
-            pattern = rule.get('pattern', '').lower()
-            target_folder = rule.get('target_folder', '')
-            
-            if pattern and target_folder:
-                # 支持通配符匹配
-                if fnmatch.fnmatch(filename, pattern):
-                    return target_folder
-                    
-        return None
+    def _compiled_custom_rules(self, custom_rules: List[Dict]):
+        """获取自定义规则的预编译结果，同一规则列表对象只编译一次
+
+        只有模式和目标文件夹都填写的规则才参与匹配，支持通配符。
+        """
+        cached = self._rule_matcher
+        if cached is None or cached[0] is not custom_rules:
+            valid_rules = [rule for rule in custom_rules
+                           if rule.get('pattern') and rule.get('target_folder')]
+            cached = self._rule_matcher = (custom_rules, compile_custom_rules(valid_rules))
+        return cached[1]
         
     def _resolve_filename_conflict(self, target_path: Path) -> Path:
         """解决文件名冲突"""
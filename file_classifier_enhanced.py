@@ -8,11 +8,42 @@
 import os
 import shutil
 import json
-import fnmatch
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Set, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple, Iterator, Callable
 import send2trash
+from concurrent.futures import ThreadPoolExecutor
+
+from file_classifier import build_extension_index, compile_custom_rules, match_custom_rule, month_folder
+
+# 可选的高速JSON序列化库
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+@dataclass
+class GroupInfo:
+    """关联组预览信息"""
+    
+    __slots__ = ('kind', 'main_file', 'main_name', 'files', 'names', 'file_count')
+    
+    kind: str              # 组类型，即组名前缀（如 project、program、individual）
+    main_file: str
+    main_name: str
+    files: List[str]
+    names: List[str]
+    file_count: int
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """转换为 preview_associations 对外返回的字典格式"""
+        return {
+            'file_count': self.file_count,
+            'files': self.files,
+            'main_file': self.main_file
+        }
 
 class EnhancedFileClassifier:
     """增强版文件分类器 - 支持文件关联检测"""
@@ -95,6 +126,13 @@ class EnhancedFileClassifier:
             'others': []
         }
         
+        # 本次分类中已创建的目标目录，同一目录只创建一次
+        self._created_dirs = set()
+        # (类型映射, 扩展名反向索引)，映射对象变化时重建
+        self._ext_index = None
+        # (自定义规则列表, 预编译规则)，规则列表对象变化时重建
+        self._rule_matcher = None
+        
         # 加载操作历史
         self.load_operation_history()
     
@@ -109,13 +147,10 @@ class EnhancedFileClassifier:
         file_groups = {}
         processed_files = set()
         
-        # 按目录分组分析
+        # 按目录分组分析（不依赖文件的返回顺序）
         directories = {}
         for file_path in all_files:
-            parent_dir = file_path.parent
-            if parent_dir not in directories:
-                directories[parent_dir] = []
-            directories[parent_dir].append(file_path)
+            directories.setdefault(file_path.parent, []).append(file_path)
         
         group_id = 0
         
@@ -301,12 +336,15 @@ class EnhancedFileClassifier:
                                        rules: List[str], operation: str = 'move',
                                        custom_rules: List[Dict] = None,
                                        type_mapping: Dict[str, List[str]] = None,
-                                       preserve_associations: bool = True) -> List[Dict]:
+                                       preserve_associations: bool = True,
+                                       progress_callback: Optional[Callable[[List[Dict]], None]] = None
+                                       ) -> List[Dict]:
         """
         带关联检测的文件分类
         
         Args:
             preserve_associations: 是否保持文件关联关系
+            progress_callback: 每处理完一个文件或文件组，用这一批结果记录调用一次
         """
         results = []
         source_path = Path(source_path)
@@ -322,8 +360,15 @@ class EnhancedFileClassifier:
             'files': []
         }
         
+        def record(batch):
+            results.extend(batch)
+            current_operation['files'].extend([r for r in batch if r['success']])
+            if progress_callback and batch:
+                progress_callback(batch)
+        
         try:
-            target_path.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.clear()
+            self._ensure_dir(target_path)
             
             if preserve_associations:
                 # 分析文件关联
@@ -333,30 +378,24 @@ class EnhancedFileClassifier:
                     if group_name == 'individual_files':
                         # 独立文件按原规则分类
                         for file_path in files_in_group:
-                            result = self._classify_single_file(
+                            record(self._classify_single_file(
                                 file_path, target_path, rules, operation, 
                                 custom_rules, type_mapping
-                            )
-                            results.extend(result)
-                            current_operation['files'].extend([r for r in result if r['success']])
+                            ))
                     else:
                         # 关联文件组一起分类
-                        group_result = self._classify_file_group(
+                        record(self._classify_file_group(
                             files_in_group, target_path, rules, operation,
                             custom_rules, type_mapping, group_name
-                        )
-                        results.extend(group_result)
-                        current_operation['files'].extend([r for r in group_result if r['success']])
+                        ))
             else:
                 # 不保持关联关系，按原逻辑分类
                 all_files = self._get_files_from_source(source_path)
                 for file_path in all_files:
-                    result = self._classify_single_file(
+                    record(self._classify_single_file(
                         file_path, target_path, rules, operation,
                         custom_rules, type_mapping
-                    )
-                    results.extend(result)
-                    current_operation['files'].extend([r for r in result if r['success']])
+                    ))
             
             # 保存操作记录
             if current_operation['files']:
@@ -391,7 +430,7 @@ class EnhancedFileClassifier:
             target_subdir = os.path.join(target_subdir, f"program_{main_file.stem}")
         
         final_target_dir = target_path / target_subdir
-        final_target_dir.mkdir(parents=True, exist_ok=True)
+        self._ensure_dir(final_target_dir)
         
         # 将组中的所有文件移动到同一目标文件夹
         for file_path in files:
@@ -467,7 +506,7 @@ class EnhancedFileClassifier:
                 file_path, rules, custom_rules, type_mapping or self.default_type_mapping
             )
             final_target_dir = target_path / target_subdir
-            final_target_dir.mkdir(parents=True, exist_ok=True)
+            self._ensure_dir(final_target_dir)
             
             # 计算目标文件路径
             initial_target_file_path = final_target_dir / file_path.name
@@ -530,13 +569,11 @@ class EnhancedFileClassifier:
         return results
     
     # 继承原有的方法
-    def _should_skip_directory(self, dir_path: Path) -> bool:
-        """检查目录是否应该被跳过（存在标志文件）"""
-        if not self.respect_flag_file:
-            return False
-        
-        flag_file_path = dir_path / self.flag_file_name
-        return flag_file_path.exists()
+    def _ensure_dir(self, dir_path: Path):
+        """创建目标目录，本次分类中已创建过的目录不再重复调用mkdir"""
+        if dir_path not in self._created_dirs:
+            dir_path.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(dir_path)
     
     def _get_files_from_source(self, source_path: Path) -> List[Path]:
         """从源路径获取所有文件，跳过带有标志文件的目录"""
@@ -545,28 +582,68 @@ class EnhancedFileClassifier:
             if source_path.is_file():
                 files.append(source_path)
             elif source_path.is_dir():
-                # 如果根目录有标志文件，直接返回空列表
-                if self._should_skip_directory(source_path):
+                # 先读根目录，根目录有标志文件时结果为空
+                listing = self._scan_dir(str(source_path))
+                if listing is None:
                     return []
+                names, subdirs = listing
+                files.extend(source_path / name for name in names)
                 
-                # 遍历目录
-                for root, dirs, filenames in os.walk(source_path):
-                    root_path = Path(root)
-                    
-                    # 检查当前目录是否有标志文件
-                    if self._should_skip_directory(root_path):
-                        # 从dirs中移除所有子目录，这样os.walk就不会继续遍历它们
-                        dirs.clear()
-                        continue
-                    
-                    # 添加当前目录中的文件
-                    for filename in filenames:
-                        if filename != self.flag_file_name:  # 不包含标志文件本身
-                            files.append(root_path / filename)
+                # 各一级子目录的子树互不相关，交给线程池并行遍历，按原顺序拼接结果
+                if len(subdirs) > 1:
+                    with ThreadPoolExecutor(max_workers=min(8, len(subdirs))) as executor:
+                        for subtree_files in executor.map(self._collect_files, subdirs):
+                            files.extend(subtree_files)
+                elif subdirs:
+                    files.extend(self._collect_files(subdirs[0]))
         except PermissionError:
             pass
         return files
     
+    def _scan_dir(self, directory: str) -> Optional[Tuple[List[str], List[str]]]:
+        """读取一个目录，返回 (文件名列表, 需要进入的子目录路径列表)
+        
+        目录中有标志文件时返回None，整个子树都被跳过；标志文件直接从目录列表中判断，不另外stat。
+        与os.walk一致：指向目录的符号链接既不算文件也不会进入，无法读取的目录视为空目录。
+        """
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            return [], []
+        
+        names = []
+        subdirs = []
+        for entry in entries:
+            if entry.name == self.flag_file_name and self.respect_flag_file:
+                # 与检查 (目录 / 标志文件名) 是否存在一致：同名的文件或目录都会排除整个目录
+                return None
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                if not entry.is_symlink():
+                    subdirs.append(entry.path)
+            elif entry.name != self.flag_file_name:  # 不包含标志文件本身
+                names.append(entry.name)
+        return names, subdirs
+    
+    def _collect_files(self, top: str) -> List[Path]:
+        """自顶向下遍历top下的所有文件（顺序与os.walk相同，同一目录的文件连续）"""
+        files = []
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            listing = self._scan_dir(directory)
+            if listing is None:
+                continue
+            names, subdirs = listing
+            dir_path = Path(directory)
+            files.extend(dir_path / name for name in names)
+            stack.extend(reversed(subdirs))
+        return files
+    
     def _determine_target_folder(self, file_path: Path, rules: List[str],
                                custom_rules: List[Dict] = None,
                                type_mapping: Dict[str, List[str]] = None) -> str:
@@ -602,20 +679,19 @@ class EnhancedFileClassifier:
     
     def _get_file_type(self, file_path: Path, type_mapping: Dict[str, List[str]]) -> str:
         """根据文件扩展名获取文件类型"""
-        extension = file_path.suffix.lower()
-        
-        for type_name, extensions in type_mapping.items():
-            if extension in extensions:
-                return type_name
-        
-        return 'others'
+        return self._extension_index(type_mapping).get(file_path.suffix.lower(), 'others')
+    
+    def _extension_index(self, type_mapping: Dict[str, List[str]]) -> Dict[str, str]:
+        """获取类型映射的扩展名反向索引，同一映射对象只构建一次"""
+        cached = self._ext_index
+        if cached is None or cached[0] is not type_mapping:
+            cached = self._ext_index = (type_mapping, build_extension_index(type_mapping))
+        return cached[1]
     
     def _get_date_folder(self, file_path: Path) -> str:
         """根据文件修改时间获取日期文件夹"""
         try:
-            mtime = os.path.getmtime(file_path)
-            date = datetime.fromtimestamp(mtime)
-            return date.strftime('%Y-%m')
+            return month_folder(os.path.getmtime(file_path))
         except:
             return '未知日期'
     
@@ -637,17 +713,17 @@ class EnhancedFileClassifier:
     
     def _apply_custom_rules(self, file_path: Path, custom_rules: List[Dict]) -> Optional[str]:
         """应用自定义规则"""
-        filename = file_path.name.lower()
-        
-        for rule in custom_rules:
-            pattern = rule.get('pattern', '').lower()
-            target_folder = rule.get('target_folder', '')
-            
-            if pattern and target_folder:
-                if fnmatch.fnmatch(filename, pattern):
-                    return target_folder
-        
-        return None
+        rule = match_custom_rule(file_path.name, self._compiled_custom_rules(custom_rules))
+        return rule['target_folder'] if rule is not None else None
+    
+    def _compiled_custom_rules(self, custom_rules: List[Dict]):
+        """获取自定义规则的预编译结果，同一规则列表对象只编译一次"""
+        cached = self._rule_matcher
+        if cached is None or cached[0] is not custom_rules:
+            valid_rules = [rule for rule in custom_rules
+                           if rule.get('pattern') and rule.get('target_folder')]
+            cached = self._rule_matcher = (custom_rules, compile_custom_rules(valid_rules))
+        return cached[1]
     
     def _resolve_filename_conflict(self, target_path: Path) -> Path:
         """解决文件名冲突"""
@@ -708,11 +784,22 @@ class EnhancedFileClassifier:
             self.operation_history = self.operation_history[-self.max_history:]
         
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.operation_history, f, ensure_ascii=False, indent=2)
+            self._write_history_file()
         except Exception as e:
             print(f"保存历史记录失败: {e}")
     
+    def _write_history_file(self):
+        """将操作历史写入文件，优先使用orjson直接写入字节"""
+        if ORJSON_AVAILABLE:
+            # 先序列化再打开文件，序列化失败时不会截断已有的历史文件
+            data = orjson.dumps(self.operation_history,
+                                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            with open(self.history_file, 'wb') as f:
+                f.write(data)
+        else:
+            with open(self.history_file, 'w', encoding='utf-8') as f:
+                json.dump(self.operation_history, f, ensure_ascii=False, indent=2)
+    
     def load_operation_history(self):
         """加载操作历史"""
         try:
@@ -723,25 +810,33 @@ class EnhancedFileClassifier:
             print(f"加载历史记录失败: {e}")
             self.operation_history = []
     
+    def iter_associations(self, file_groups: Dict[str, List[Path]]) -> Iterator[Tuple[str, GroupInfo]]:
+        """逐组生成关联预览信息，避免一次性构建全部预览数据"""
+        for group_name, files in file_groups.items():
+            main_file = self._get_main_file_from_group(files) if len(files) > 1 else files[0]
+            yield group_name, GroupInfo(
+                kind=group_name.split('_', 1)[0],
+                main_file=str(main_file),
+                main_name=main_file.name,
+                files=[str(f) for f in files],
+                names=[f.name for f in files],
+                file_count=len(files)
+            )
+    
     def preview_associations(self, source_path: str) -> Dict[str, Any]:
-        """预览文件关联关系"""
+        """预览文件关联关系（一次性构建全部分组，大目录建议使用 iter_associations）
+
+        每个分组为 {'file_count', 'files', 'main_file'} 字典，可直接序列化为JSON。
+        """
         source_path = Path(source_path)
         file_groups = self.analyze_file_associations(source_path)
         
-        preview_info = {
+        return {
             'total_files': sum(len(files) for files in file_groups.values()),
             'total_groups': len(file_groups),
-            'groups': {}
+            'groups': {group_name: group_info.as_dict()
+                       for group_name, group_info in self.iter_associations(file_groups)}
         }
-        
-        for group_name, files in file_groups.items():
-            preview_info['groups'][group_name] = {
-                'file_count': len(files),
-                'files': [str(f) for f in files],
-                'main_file': str(self._get_main_file_from_group(files)) if len(files) > 1 else str(files[0])
-            }
-        
-        return preview_info
     
     def undo_last_operation(self) -> tuple[bool, str]:
         """
@@ -795,8 +890,7 @@ class EnhancedFileClassifier:
             
             # 更新历史文件
             try:
-                with open(self.history_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.operation_history, f, ensure_ascii=False, indent=2)
+                self._write_history_file()
             except Exception as e:
                 print(f"更新历史文件失败: {e}")
             
@@ -7,17 +7,99 @@
 
 import os
 import hashlib
+import heapq
 import json
+import mmap
 import time
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple, Set
+from typing import Dict, List, Any, Optional, Tuple, Set, Callable
 from collections import defaultdict, Counter
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 import mimetypes
+import re
+
+# 关键词切分：空白、下划线、连字符之外的连续字符
+_KEYWORD_PATTERN = re.compile(r'[^\s_-]+')
+# 常见无意义词汇
+_STOP_WORDS = frozenset({'and', 'or', 'the', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'of', 'with'})
+
+
+
+# 遍历时直接跳过的目录（版本库、依赖、缓存、系统目录等）
+SKIP_DIRS = frozenset({
+    '.git', '.svn', '.hg', 'node_modules', '__pycache__', '.venv', 'venv',
+    '$RECYCLE.BIN', 'System Volume Information', '.cache',
+})
+
+
+def _iter_file_entries(directory, exclude_dirs=frozenset()):
+    """用os.scandir递归遍历目录下的所有文件，返回DirEntry（类型和stat信息由目录读取结果缓存）
+
+    与Path.rglob一致：不进入指向目录的符号链接，无权限访问的子目录直接跳过；
+    名称在exclude_dirs中的子目录不会进入。
+    """
+    stack = [directory]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in exclude_dirs:
+                                stack.append(entry.path)
+                        elif entry.is_file():
+                            yield entry
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+# 超过该大小的文件用内存映射计算摘要
+_MMAP_THRESHOLD = 8 * 1024 * 1024
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _head_digest(path: str, size: int = 4096) -> bytes:
+    """文件开头部分的摘要，读取失败返回空"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.blake2b(f.read(size), digest_size=16).digest()
+    except OSError:
+        return b""
+
+
+def _full_digest(path: str) -> str:
+    """完整文件内容的摘要，读取失败返回空字符串"""
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size > _MMAP_THRESHOLD:
+                # 大文件用内存映射按块哈希，由内核负责预读
+                digest = hashlib.blake2b()
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as view:
+                        for offset in range(0, size, _HASH_CHUNK_SIZE):
+                            digest.update(view[offset:offset + _HASH_CHUNK_SIZE])
+                return digest.hexdigest()
+            if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+                return hashlib.file_digest(f, 'blake2b').hexdigest()
+            digest = hashlib.blake2b()
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+            return digest.hexdigest()
+    except (OSError, ValueError):
+        return ""
+
 
 class IntelligentRecommendationEngine:
     """智能推荐引擎"""
     
+    # 清理分析时每处理多少个文件回报一次进度
+    PROGRESS_INTERVAL = 256
+    
     def __init__(self):
         self.config_dir = Path.home() / '.file_classifier_ai'
         self.config_dir.mkdir(exist_ok=True)
@@ -41,6 +123,9 @@ class IntelligentRecommendationEngine:
         # 重复文件阈值（字节）
         self.duplicate_size_threshold = 1024  # 1KB以上才检查重复
         
+        # 用户行为变化计数，调用方可据此判断缓存的分类建议是否失效
+        self.behavior_version = 0
+        
     def _load_user_behavior(self) -> Dict[str, Any]:
         """加载用户行为历史"""
         if self.user_behavior_file.exists():
@@ -108,6 +193,37 @@ class IntelligentRecommendationEngine:
             return ""
         return hash_md5.hexdigest()
     
+    def _find_duplicate_groups(self, size_groups: Dict[int, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+        """分级筛选重复文件：大小相同 -> 文件头摘要相同 -> 完整内容摘要相同"""
+        file_hashes = defaultdict(list)
+        full_candidates = []
+        for files in size_groups.values():
+            if len(files) < 2:
+                continue
+            
+            # 先只读文件头，大多数同大小的文件在这里就能区分开
+            head_groups = defaultdict(list)
+            for file_info in files:
+                head = _head_digest(file_info['path'])
+                if head:
+                    head_groups[head].append(file_info)
+            
+            for candidates in head_groups.values():
+                if len(candidates) >= 2:
+                    full_candidates.extend(candidates)
+        
+        if not full_candidates:
+            return file_hashes
+        
+        # 哈希计算会释放GIL，多线程并行读取和计算完整摘要
+        paths = [file_info['path'] for file_info in full_candidates]
+        with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, len(paths))) as executor:
+            digests = executor.map(_full_digest, paths)
+            for file_info, digest in zip(full_candidates, digests):
+                if digest:
+                    file_hashes[digest].append(file_info)
+        return file_hashes
+    
     def _analyze_file_content(self, file_path: Path) -> Dict[str, Any]:
         """分析文件内容特征"""
         try:
@@ -133,21 +249,14 @@ class IntelligentRecommendationEngine:
     
     def _extract_keywords(self, file_path: Path) -> List[str]:
         """从文件名和路径中提取关键词"""
-        keywords = []
-        
-        # 从文件名提取
-        name_parts = file_path.stem.lower().replace('_', ' ').replace('-', ' ').split()
-        keywords.extend(name_parts)
+        # 从文件名提取（一次扫描按空白、下划线、连字符切分）
+        keywords = {m.group() for m in _KEYWORD_PATTERN.finditer(file_path.stem.lower())}
         
         # 从路径提取
-        path_parts = [p.lower() for p in file_path.parts[:-1]]
-        keywords.extend(path_parts)
+        keywords.update(p.lower() for p in file_path.parts[:-1])
         
         # 过滤常见无意义词汇
-        stop_words = {'and', 'or', 'the', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'of', 'with'}
-        keywords = [k for k in keywords if k not in stop_words and len(k) > 1]
-        
-        return list(set(keywords))
+        return [k for k in keywords if len(k) > 1 and k not in _STOP_WORDS]
     
     def record_user_action(self, action_type: str, file_path: str, 
                           original_suggestion: str, final_location: str):
@@ -169,6 +278,7 @@ class IntelligentRecommendationEngine:
         
         # 更新偏好统计
         self._update_preferences(action)
+        self.behavior_version += 1
         self._save_user_behavior()
     
     def _update_preferences(self, action: Dict[str, Any]):
@@ -214,7 +324,7 @@ class IntelligentRecommendationEngine:
         extension = file_path.suffix.lower()
         if extension in self.user_behavior['file_type_preferences']:
             type_prefs = self.user_behavior['file_type_preferences'][extension]
-            for location, count in sorted(type_prefs.items(), key=lambda x: x[1], reverse=True):
+            for location, count in sorted(type_prefs.items(), key=itemgetter(1), reverse=True):
                 if location in possible_locations:
                     confidence = min(count / 10.0, 1.0)  # 最多10次记录达到100%置信度
                     suggestions.append({
@@ -271,15 +381,21 @@ class IntelligentRecommendationEngine:
         # 去重并排序
         location_seen = set()
         unique_suggestions = []
-        for suggestion in sorted(suggestions, key=lambda x: x['confidence'], reverse=True):
+        for suggestion in sorted(suggestions, key=itemgetter('confidence'), reverse=True):
             if suggestion['location'] not in location_seen:
                 location_seen.add(suggestion['location'])
                 unique_suggestions.append(suggestion)
         
         return unique_suggestions[:5]  # 返回前5个建议
     
-    def get_cleanup_suggestions(self, directory_path: str) -> Dict[str, List[Dict[str, Any]]]:
-        """识别重复文件、临时文件、过期文件等"""
+    def get_cleanup_suggestions(self, directory_path: str,
+                                exclude_dirs: Set[str] = SKIP_DIRS,
+                                progress_cb: Optional[Callable[[int, int], None]] = None
+                                ) -> Dict[str, List[Dict[str, Any]]]:
+        """识别重复文件、临时文件、过期文件等（跳过exclude_dirs中的子目录）
+
+        progress_cb(已处理数, 总数) 每处理PROGRESS_INTERVAL个文件调用一次。
+        """
         directory = Path(directory_path)
         if not directory.exists() or not directory.is_dir():
             return {}
@@ -294,84 +410,111 @@ class IntelligentRecommendationEngine:
         
         # 收集所有文件
         all_files = []
-        file_hashes = defaultdict(list)
+        size_groups = defaultdict(list)
         
-        for file_path in directory.rglob('*'):
-            if file_path.is_file():
-                try:
-                    stat = file_path.stat()
-                    file_info = {
-                        'path': str(file_path),
-                        'size': stat.st_size,
-                        'modified_time': stat.st_mtime,
-                        'created_time': stat.st_ctime,
-                        'name': file_path.name
-                    }
-                    all_files.append(file_info)
-                    
-                    # 检查重复文件
-                    if stat.st_size > self.duplicate_size_threshold:
-                        file_hash = self._get_file_hash(file_path)
-                        if file_hash:
-                            file_hashes[file_hash].append(file_info)
-                except Exception as e:
-                    print(f"处理文件 {file_path} 时出错: {e}")
-                    continue
+        entries = list(_iter_file_entries(directory, exclude_dirs))
+        total = len(entries)
+        for index, entry in enumerate(entries):
+            if progress_cb and index % self.PROGRESS_INTERVAL == 0:
+                progress_cb(index, total)
+            try:
+                stat = entry.stat()
+                file_info = {
+                    'path': entry.path,
+                    'size': stat.st_size,
+                    'modified_time': stat.st_mtime,
+                    'created_time': stat.st_ctime,
+                    'name': entry.name
+                }
+                all_files.append(file_info)
+                
+                # 按大小分组，只有大小相同的文件才可能重复
+                if stat.st_size > self.duplicate_size_threshold:
+                    size_groups[stat.st_size].append(file_info)
+            except Exception as e:
+                print(f"处理文件 {entry.path} 时出错: {e}")
+                continue
+        
+        if progress_cb:
+            progress_cb(total, total)
+        
+        file_hashes = self._find_duplicate_groups(size_groups)
         
         # 识别重复文件
         for hash_value, files in file_hashes.items():
             if len(files) > 1:
                 # 按修改时间排序，最新的保留，其他的标记为重复
-                files_sorted = sorted(files, key=lambda x: x['modified_time'], reverse=True)
+                files_sorted = sorted(files, key=itemgetter('modified_time'), reverse=True)
                 for duplicate_file in files_sorted[1:]:
                     suggestions['duplicates'].append({
                         'path': duplicate_file['path'],
+                        'name': duplicate_file['name'],
                         'size': duplicate_file['size'],
+                        'modified_time': duplicate_file['modified_time'],
                         'reason': f'与 {files_sorted[0]["path"]} 重复',
                         'can_delete': True,
-                        'original': files_sorted[0]['path']
+                        'original': files_sorted[0]['path'],
+                        'original_size': files_sorted[0]['size'],
+                        'original_modified_time': files_sorted[0]['modified_time']
                     })
         
         # 识别临时文件
+        temp_extensions = self.temp_patterns['extensions']
+        # 所有临时前缀编译成一个正则，一次匹配同时得到命中的前缀（长前缀优先）
+        temp_prefixes = sorted(self.temp_patterns['prefixes'], key=len, reverse=True)
+        temp_prefix_re = re.compile('|'.join(map(re.escape, temp_prefixes))) if temp_prefixes else None
+        temp_folders = self.temp_patterns['folders']
+        folder_reasons = {}  # 目录 -> 临时目录原因（同一目录下的文件只判断一次）
         for file_info in all_files:
-            file_path = Path(file_info['path'])
+            path = file_info['path']
+            name = file_info['name']
             is_temp = False
             reason = ""
             
             # 检查扩展名
-            if file_path.suffix.lower() in self.temp_patterns['extensions']:
+            suffix = os.path.splitext(name)[1]
+            if suffix.lower() in temp_extensions:
                 is_temp = True
-                reason = f"临时文件扩展名: {file_path.suffix}"
+                reason = f"临时文件扩展名: {suffix}"
             
             # 检查前缀
-            for prefix in self.temp_patterns['prefixes']:
-                if file_path.name.startswith(prefix):
-                    is_temp = True
-                    reason = f"临时文件前缀: {prefix}"
-                    break
+            prefix_match = temp_prefix_re.match(name) if temp_prefix_re else None
+            if prefix_match:
+                is_temp = True
+                reason = f"临时文件前缀: {prefix_match.group()}"
             
             # 检查路径中的临时文件夹
-            for part in file_path.parts:
-                if part.lower() in self.temp_patterns['folders']:
-                    is_temp = True
-                    reason = f"位于临时目录: {part}"
-                    break
+            directory = os.path.dirname(path)
+            folder_reason = folder_reasons.get(directory)
+            if folder_reason is None:
+                folder_reason = next((f"位于临时目录: {part}" for part in Path(directory).parts
+                                      if part.lower() in temp_folders), "")
+                folder_reasons[directory] = folder_reason
+            if not folder_reason and name.lower() in temp_folders:
+                folder_reason = f"位于临时目录: {name}"
+            if folder_reason:
+                is_temp = True
+                reason = folder_reason
             
             if is_temp:
                 suggestions['temp_files'].append({
-                    'path': file_info['path'],
+                    'path': path,
+                    'name': name,
                     'size': file_info['size'],
+                    'modified_time': file_info['modified_time'],
                     'reason': reason,
                     'can_delete': True
                 })
         
         # 识别大文件（超过100MB）
         large_files = [f for f in all_files if f['size'] > 100 * 1024 * 1024]
-        for file_info in sorted(large_files, key=lambda x: x['size'], reverse=True)[:20]:
+        for file_info in heapq.nlargest(20, large_files, key=itemgetter('size')):
             suggestions['large_files'].append({
                 'path': file_info['path'],
+                'name': file_info['name'],
                 'size': file_info['size'],
                 'size_mb': round(file_info['size'] / (1024 * 1024), 1),
+                'modified_time': file_info['modified_time'],
                 'reason': '占用大量存储空间',
                 'can_archive': True
             })
@@ -383,8 +526,10 @@ class IntelligentRecommendationEngine:
             days_old = int((time.time() - file_info['modified_time']) / (24 * 3600))
             suggestions['old_files'].append({
                 'path': file_info['path'],
+                'name': file_info['name'],
                 'size': file_info['size'],
                 'days_old': days_old,
+                'modified_time': file_info['modified_time'],
                 'reason': f'{days_old}天未修改，可能已过期',
                 'can_archive': True
             })
@@ -394,6 +539,9 @@ class IntelligentRecommendationEngine:
         for file_info in empty_files:
             suggestions['empty_files'].append({
                 'path': file_info['path'],
+                'name': file_info['name'],
+                'size': 0,
+                'modified_time': file_info['modified_time'],
                 'reason': '空文件，可能无用',
                 'can_delete': True
             })
@@ -409,10 +557,9 @@ class IntelligentRecommendationEngine:
         reminders = []
         
         try:
-            # 统计文件夹信息
-            all_items = list(directory.iterdir())
-            files = [item for item in all_items if item.is_file()]
-            folders = [item for item in all_items if item.is_dir()]
+            # 统计文件夹信息（scandir的DirEntry自带类型信息，无需逐个stat）
+            with os.scandir(directory) as it:
+                files = [entry for entry in it if entry.is_file()]
             
             # 检查文件数量过多
             if len(files) > 50:
@@ -426,8 +573,8 @@ class IntelligentRecommendationEngine:
             
             # 检查文件类型混乱
             file_types = defaultdict(int)
-            for file_path in files:
-                extension = file_path.suffix.lower()
+            for entry in files:
+                extension = os.path.splitext(entry.name)[1].lower()
                 file_types[extension] += 1
             
             if len(file_types) > 10:
@@ -453,8 +600,8 @@ class IntelligentRecommendationEngine:
             
             # 检查文件名混乱
             messy_names = []
-            for file_path in files:
-                name = file_path.name
+            for entry in files:
+                name = entry.name
                 if any(char in name for char in ['(1)', '(2)', '副本', 'copy', 'Copy']):
                     messy_names.append(name)
             
@@ -469,9 +616,10 @@ class IntelligentRecommendationEngine:
                 })
             
             # 检查大文件占比
-            total_size = sum(file_path.stat().st_size for file_path in files)
+            sizes = [entry.stat().st_size for entry in files]
+            total_size = sum(sizes)
             if total_size > 1024 * 1024 * 1024:  # 超过1GB
-                large_files = [f for f in files if f.stat().st_size > 50 * 1024 * 1024]
+                large_files = [size for size in sizes if size > 50 * 1024 * 1024]
                 if large_files:
                     reminders.append({
                         'type': 'large_directory',
@@ -504,15 +652,38 @@ class IntelligentRecommendationEngine:
         
         return reminders
     
-    def _calculate_max_depth(self, directory: Path, current_depth: int = 0) -> int:
-        """计算文件夹的最大嵌套深度"""
+    def _calculate_max_depth(self, directory, current_depth: int = 0,
+                             visited: Optional[Set[Tuple[int, int]]] = None) -> int:
+        """计算文件夹的最大嵌套深度
+
+        会进入指向目录的符号链接，用已访问目录的 (st_dev, st_ino) 防止链接成环时无限递归。
+        """
+        if visited is None:
+            try:
+                st = os.stat(directory)
+            except OSError:
+                return current_depth
+            visited = {(st.st_dev, st.st_ino)}
+        
         max_depth = current_depth
         try:
-            for item in directory.iterdir():
-                if item.is_dir():
-                    depth = self._calculate_max_depth(item, current_depth + 1)
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if not entry.is_dir():
+                            continue
+                        # 只有经过符号链接才可能回到已访问的目录，普通目录不必额外stat
+                        if entry.is_symlink():
+                            st = entry.stat()
+                            key = (st.st_dev, st.st_ino)
+                            if key in visited:
+                                continue
+                            visited.add(key)
+                    except OSError:
+                        continue
+                    depth = self._calculate_max_depth(entry.path, current_depth + 1, visited)
                     max_depth = max(max_depth, depth)
-        except PermissionError:
+        except OSError:
             pass
         return max_depth
     
@@ -523,7 +694,10 @@ class IntelligentRecommendationEngine:
                 return datetime.fromisoformat(action['timestamp'])
         return None
     
-    def generate_recommendations_report(self, directory_path: str) -> Dict[str, Any]:
+    def generate_recommendations_report(self, directory_path: str,
+                                        exclude_dirs: Set[str] = SKIP_DIRS,
+                                        progress_cb: Optional[Callable[[int, int], None]] = None
+                                        ) -> Dict[str, Any]:
         """生成完整的推荐报告"""
         directory = Path(directory_path)
         if not directory.exists():
@@ -533,7 +707,7 @@ class IntelligentRecommendationEngine:
             'timestamp': datetime.now().isoformat(),
             'directory': str(directory),
             'summary': {},
-            'cleanup_suggestions': self.get_cleanup_suggestions(str(directory)),
+            'cleanup_suggestions': self.get_cleanup_suggestions(str(directory), exclude_dirs, progress_cb),
             'organization_reminders': self.get_organization_reminders(str(directory)),
             'recommendations': []
         }
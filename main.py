@@ -8,8 +8,15 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
+import sys
+import importlib.util
 import threading
 import queue
+import time
+import functools
+import multiprocessing
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any
@@ -19,17 +26,138 @@ from file_classifier import FileClassifier
 from config_manager import ConfigManager
 from file_monitor import FileMonitor
 
-# 智能推荐相关导入
-try:
-    from recommendations_dialog import show_recommendations_dialog
-    RECOMMENDATIONS_AVAILABLE = True
-except ImportError:
-    RECOMMENDATIONS_AVAILABLE = False
+# 增强版分类器和智能推荐模块都在首次使用时才在函数内导入（普通import语句，打包工具可以识别）
+# 这里只检查推荐模块是否存在，不执行模块代码
+RECOMMENDATIONS_AVAILABLE = importlib.util.find_spec('recommendations_dialog') is not None
+if not RECOMMENDATIONS_AVAILABLE:
     print("智能推荐模块不可用，请检查依赖是否正确安装")
 
+# 文件大小单位
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+# 关联组类型表：组类型（组名前缀） -> (图标, 类型名称, 说明)
+_GROUP_KINDS = {
+    'project': ("🔧", "项目文件夹", "包含项目源码、配置文件等，将保持完整性"),
+    'program': ("⚙️", "程序文件组", "包含可执行文件及其依赖库、配置文件"),
+    'web': ("🌐", "网页文件组", "包含HTML文件及相关的CSS、JS、图片资源"),
+    'media': ("🎬", "媒体文件组", "包含视频文件及其字幕、海报等相关文件"),
+    'samename': ("📋", "同名文件组", "相同名称但不同扩展名的文件"),
+}
+
+def _group_kind(group_name):
+    """根据组名前缀获取 (图标, 类型名称, 说明)，未知类型返回None"""
+    return _GROUP_KINDS.get(group_name.split('_', 1)[0])
+
+@functools.lru_cache(maxsize=1024)
+def _format_timestamp(timestamp):
+    """把精确到秒的ISO时间戳格式化为 HH:MM:SS，无法解析时返回None"""
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).strftime('%H:%M:%S')
+    except ValueError:
+        return None
+
+def _format_group(kind, main_name, names):
+    """格式化单个关联组的预览文本"""
+    file_count = len(names)
+    parts = []
+    if kind == 'individual':
+        parts.append(f"📄 独立文件 ({file_count} 个文件)\n")
+        parts.append("    这些文件将按常规规则分类，不保持特殊关联\n")
+        head = names[:10]  # 只显示前10个文件
+        for name in head:
+            parts.append(f"    • {name}\n")
+        remaining = file_count - len(head)
+        if remaining > 0:
+            parts.append(f"    ... 还有 {remaining} 个文件\n")
+        parts.append("\n")
+    else:
+        kind_info = _GROUP_KINDS.get(kind)
+        if kind_info:
+            group_type = f"{kind_info[0]} {kind_info[1]}"
+            group_desc = kind_info[2]
+        else:
+            group_type = "未知类型"
+            group_desc = ""
+        
+        parts.append(f"{group_type} ({file_count} 个文件)\n")
+        parts.append(f"    {group_desc}\n")
+        parts.append(f"    主文件: {main_name}\n")
+        parts.append("    包含文件:\n")
+        for name in names:
+            parts.append(f"      • {name}\n")
+        parts.append("\n")
+    return "".join(parts)
+
+# 工作进程内常驻的分类器和结果队列（由进程池initializer创建）
+_worker_classifier = None
+_worker_progress = None
+
+# 处理结果每累积这么多条或间隔这么久就交出一批
+_PROGRESS_BATCH_SIZE = 200
+_PROGRESS_BATCH_INTERVAL = 0.2
+
+class _ResultBatcher:
+    """把逐条产生的处理结果攒成批次后交给send，减少线程/进程间的消息数"""
+    
+    __slots__ = ('_send', '_pending', '_last_flush')
+    
+    def __init__(self, send):
+        self._send = send
+        self._pending = []
+        self._last_flush = time.monotonic()
+    
+    def __call__(self, batch):
+        self._pending.extend(batch)
+        now = time.monotonic()
+        if len(self._pending) >= _PROGRESS_BATCH_SIZE or now - self._last_flush >= _PROGRESS_BATCH_INTERVAL:
+            self.flush(now)
+    
+    def flush(self, now=None):
+        """交出剩余的结果（每次交出新列表，已交出的列表不再修改）"""
+        if self._pending:
+            self._send(self._pending)
+            self._pending = []
+        self._last_flush = now or time.monotonic()
+
+def _init_classify_worker(progress_queue):
+    """工作进程初始化：创建一次分类器，之后的任务都复用它"""
+    global _worker_classifier, _worker_progress
+    from file_classifier_enhanced import EnhancedFileClassifier
+    _worker_classifier = EnhancedFileClassifier()
+    _worker_progress = progress_queue
+
+def _classify_worker(source_path, target_path, rules, operation, custom_rules,
+                     type_mapping, flag_file_settings):
+    """在子进程中执行带关联检测的分类，避免与界面线程争用GIL
+
+    处理结果分批放入结果队列，最后放入None表示结束。
+    """
+    classifier = _worker_classifier
+    classifier.respect_flag_file, classifier.flag_file_name = flag_file_settings
+    # 主进程可能已撤销过操作，以文件中的历史为准
+    classifier.load_operation_history()
+    
+    batcher = _ResultBatcher(_worker_progress.put)
+    try:
+        return classifier.classify_files_with_associations(
+            source_path, target_path, rules, operation,
+            custom_rules, type_mapping, preserve_associations=True,
+            progress_callback=batcher
+        )
+    finally:
+        batcher.flush()
+        _worker_progress.put(None)
+
 class FileClassifierApp:
     """文件分类器主应用程序"""
     
+    # 每次消息轮询最多插入的结果行数
+    MAX_INSERTS_PER_TICK = 500
+    # 每轮最多处理的消息数
+    MAX_MESSAGES_PER_TICK = 64
+    # 监控统计刷新间隔（秒）
+    MONITOR_STATS_INTERVAL = 5.0
+    
     def __init__(self, root):
         self.root = root
         self.root.title("智能文件分类器 v1.0")
@@ -39,29 +167,87 @@ class FileClassifierApp:
         # 初始化组件
         self.config_manager = ConfigManager()
         
-        # 尝试使用增强版分类器
-        try:
-            from file_classifier_enhanced import EnhancedFileClassifier
-            self.classifier = EnhancedFileClassifier()
-        except ImportError:
-            self.classifier = FileClassifier()
+        # 默认使用原版分类器；增强版分类器在首次关联分类或预览时才导入并创建
+        self.classifier = FileClassifier()
+        self._enhanced_classifier = None
+        self._enhanced_unavailable = False
+        # 界面线程和后台任务线程都会获取增强版分类器，创建过程需要加锁
+        self._enhanced_lock = threading.Lock()
+        # 标志文件设置 (是否启用, 文件名)，创建增强版分类器时应用
+        self._flag_file_settings = (True, '.noclassify')
             
         self.file_monitor = None
         
+        # 关联分类使用的常驻工作进程及其结果队列（首次分类时才创建）
+        self._pool = None
+        self._progress_queue = None
+        
         # 状态变量
         self.monitoring = False
         self.processing = False
         
         # 消息队列（用于线程间通信）
-        self.message_queue = queue.Queue()
+        self.message_queue = queue.SimpleQueue()
+        # 待批量插入的结果 [(结果, 后台预先构建的行或None)]
+        self._pending_result_items = []
+        
+        # 路径存在性缓存 {path: (检查时间, 是否存在)}
+        self._path_cache = {}
+        
+        # 常驻后台线程，依次执行提交的任务
+        self._job_queue = queue.SimpleQueue()
+        threading.Thread(target=self._job_worker, daemon=True).start()
         
         # 设置UI
         self.setup_ui()
         self.load_config()
         
-        # 启动消息处理
+        # 启动消息处理（唯一的定时循环，监控统计也在其中按间隔刷新）
+        self._tick_id = None
+        self._next_monitor_stats = 0.0
         self.process_messages()
         
+    def _get_enhanced_classifier(self):
+        """获取缓存的增强版分类器实例（首次调用时才导入模块），不可用时返回None"""
+        with self._enhanced_lock:
+            if self._enhanced_classifier is None and not self._enhanced_unavailable:
+                try:
+                    from file_classifier_enhanced import EnhancedFileClassifier
+                except ImportError as e:
+                    # 模块或其依赖缺失；创建实例时的其他错误照常抛出，下次仍会重试
+                    print(f"增强版分类器不可用: {e}")
+                    self._enhanced_unavailable = True
+                    return None
+                classifier = EnhancedFileClassifier()
+                classifier.respect_flag_file, classifier.flag_file_name = self._flag_file_settings
+                self._enhanced_classifier = classifier
+            return self._enhanced_classifier
+    
+    def _reload_operation_history(self):
+        """两个分类器共用同一个历史文件，任一方写入后让双方都以文件为准"""
+        self.classifier.load_operation_history()
+        if self._enhanced_classifier is not None:
+            self._enhanced_classifier.load_operation_history()
+        
+    def _job_worker(self):
+        """后台任务循环"""
+        while True:
+            job = self._job_queue.get()
+            try:
+                job()
+            except Exception as e:
+                self.message_queue.put(('error', f"后台任务执行失败: {str(e)}"))
+                
+    def _exists_cached(self, path, ttl=2.0):
+        """检查路径是否存在，短时间内重复检查直接使用缓存结果"""
+        now = time.time()
+        cached = self._path_cache.get(path)
+        if cached and now - cached[0] < ttl:
+            return cached[1]
+        exists = os.path.exists(path)
+        self._path_cache[path] = (now, exists)
+        return exists
+        
     def setup_ui(self):
         """设置用户界面"""
         # 创建主框架
@@ -162,6 +348,12 @@ class FileClassifierApp:
             'by_custom': tk.BooleanVar(value=False)
         }
         
+        # 缓存已启用的规则，勾选状态变化时更新
+        self._enabled_rules = ()
+        for var in self.rule_vars.values():
+            var.trace_add('write', self._refresh_enabled_rules)
+        self._refresh_enabled_rules()
+        
         rule_checkboxes_frame = ttk.Frame(rules_frame)
         rule_checkboxes_frame.grid(row=0, column=0, sticky=tk.W)
         
@@ -174,6 +366,10 @@ class FileClassifierApp:
         ttk.Checkbutton(rule_checkboxes_frame, text="使用自定义规则", 
                        variable=self.rule_vars['by_custom']).grid(row=0, column=3, sticky=tk.W, padx=5)
         
+    def _refresh_enabled_rules(self, *args):
+        """重新计算已启用的分类规则"""
+        self._enabled_rules = tuple(rule for rule, var in self.rule_vars.items() if var.get())
+        
     def create_options_section(self, parent):
         """创建操作选项区域"""
         options_frame = ttk.LabelFrame(parent, text="操作选项", padding="10")
@@ -305,14 +501,31 @@ class FileClassifierApp:
             self.result_tree.heading(col, text=col, command=lambda c=col: self.sort_results(c))
             self.result_tree.column(col, width=column_widths.get(col, 100))
         
-        # 添加滚动条
-        scrollbar_y = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=self.result_tree.yview)
+        # 配置标签样式
+        self.result_tree.tag_configure("success", foreground="green")
+        self.result_tree.tag_configure("error", foreground="red")
+        self.result_tree.tag_configure("preview", foreground="blue")
+        
+        # 虚拟列表：完整结果保存在内存中，Treeview只渲染可见范围内的行
+        self._results = []
+        self._result_rows = []
+        self._view_first = 0
+        self._view_count = 0
+        self._row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        
+        # 添加滚动条（纵向滚动由虚拟列表自行处理）
+        self.result_scrollbar_y = ttk.Scrollbar(results_frame, orient=tk.VERTICAL,
+                                                command=self._on_result_scroll)
         scrollbar_x = ttk.Scrollbar(results_frame, orient=tk.HORIZONTAL, command=self.result_tree.xview)
-        self.result_tree.configure(yscrollcommand=scrollbar_y.set, xscrollcommand=scrollbar_x.set)
+        self.result_tree.configure(xscrollcommand=scrollbar_x.set)
+        self.result_tree.bind("<Configure>", self._on_result_tree_configure)
+        self.result_tree.bind("<MouseWheel>", self._on_result_mousewheel)
+        self.result_tree.bind("<Button-4>", self._on_result_mousewheel)
+        self.result_tree.bind("<Button-5>", self._on_result_mousewheel)
         
         # 布局
         self.result_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        scrollbar_y.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.result_scrollbar_y.grid(row=0, column=1, sticky=(tk.N, tk.S))
         scrollbar_x.grid(row=1, column=0, sticky=(tk.W, tk.E))
         
         # 绑定右键菜单
@@ -362,6 +575,7 @@ class FileClassifierApp:
         """浏览源文件夹"""
         folder = filedialog.askdirectory(title="选择源文件夹")
         if folder:
+            self._path_cache.pop(folder, None)
             self.source_var.set(folder)
             self.config_manager.add_recent_path(folder, 'source')
             self.update_path_history()
@@ -370,19 +584,20 @@ class FileClassifierApp:
         """浏览目标文件夹"""
         folder = filedialog.askdirectory(title="选择目标文件夹")
         if folder:
+            self._path_cache.pop(folder, None)
             self.target_var.set(folder)
             self.config_manager.add_recent_path(folder, 'target')
             self.update_path_history()
             
     def update_path_history(self):
         """更新路径历史记录"""
+        snapshot = self.config_manager.snapshot()
+        
         # 更新源路径历史
-        recent_sources = self.config_manager.get_recent_paths('source')
-        self.source_combo['values'] = recent_sources
+        self.source_combo['values'] = snapshot.recent_sources
         
         # 更新目标路径历史
-        recent_targets = self.config_manager.get_recent_paths('target')
-        self.target_combo['values'] = recent_targets
+        self.target_combo['values'] = snapshot.recent_targets
     
     def preview_file_associations(self):
         """预览文件关联关系"""
@@ -390,23 +605,25 @@ class FileClassifierApp:
             messagebox.showwarning("提示", "请先选择源文件夹")
             return
         
-        if not os.path.exists(self.source_var.get()):
+        if not self._exists_cached(self.source_var.get()):
             messagebox.showerror("错误", "源文件夹不存在")
             return
         
         try:
-            from file_classifier_enhanced import EnhancedFileClassifier
-            enhanced_classifier = EnhancedFileClassifier()
+            enhanced_classifier = self._get_enhanced_classifier()
+            if enhanced_classifier is None:
+                messagebox.showerror("错误", "增强版分类器不可用")
+                return
             
-            associations = enhanced_classifier.preview_associations(self.source_var.get())
+            file_groups = enhanced_classifier.analyze_file_associations(Path(self.source_var.get()))
             
             # 创建预览窗口
-            self.show_associations_preview(associations)
+            self.show_associations_preview(file_groups)
             
         except Exception as e:
             messagebox.showerror("错误", f"预览文件关联失败: {str(e)}")
     
-    def show_associations_preview(self, associations):
+    def show_associations_preview(self, file_groups):
         """显示文件关联预览窗口"""
         preview_window = tk.Toplevel(self.root)
         preview_window.title("文件关联预览")
@@ -431,15 +648,18 @@ class FileClassifierApp:
                                font=("微软雅黑", 14, "bold"))
         title_label.pack(side=tk.LEFT)
         
+        total_files = sum(len(files) for files in file_groups.values())
         stats_label = ttk.Label(title_frame, 
-                               text=f"总文件数: {associations['total_files']} | 关联组数: {associations['total_groups']}")
+                               text=f"总文件数: {total_files} | 关联组数: {len(file_groups)}")
         stats_label.pack(side=tk.RIGHT)
         
         # 创建滚动文本框
         text_frame = ttk.Frame(main_frame)
         text_frame.pack(fill=tk.BOTH, expand=True)
         
-        text_widget = tk.Text(text_frame, wrap=tk.WORD, font=("微软雅黑", 10))
+        # 只读报告无需撤销记录
+        text_widget = tk.Text(text_frame, wrap=tk.WORD, font=("微软雅黑", 10),
+                              undo=False, autoseparators=False, maxundo=0)
         scrollbar_y = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=text_widget.yview)
         scrollbar_x = ttk.Scrollbar(text_frame, orient=tk.HORIZONTAL, command=text_widget.xview)
         text_widget.configure(yscrollcommand=scrollbar_y.set, xscrollcommand=scrollbar_x.set)
@@ -448,48 +668,13 @@ class FileClassifierApp:
         scrollbar_y.pack(side=tk.RIGHT, fill=tk.Y)
         scrollbar_x.pack(side=tk.BOTTOM, fill=tk.X)
         
-        # 填充关联信息
-        content = ""
-        for group_name, group_info in associations['groups'].items():
-            if group_name == 'individual_files':
-                content += f"📄 独立文件 ({group_info['file_count']} 个文件)\n"
-                content += "    这些文件将按常规规则分类，不保持特殊关联\n"
-                if group_info['file_count'] <= 10:  # 只显示前10个文件
-                    for file_path in group_info['files']:
-                        content += f"    • {Path(file_path).name}\n"
-                else:
-                    for file_path in group_info['files'][:10]:
-                        content += f"    • {Path(file_path).name}\n"
-                    content += f"    ... 还有 {group_info['file_count'] - 10} 个文件\n"
-                content += "\n"
-            else:
-                group_type = "未知类型"
-                group_desc = ""
-                if group_name.startswith('project_'):
-                    group_type = "🔧 项目文件夹"
-                    group_desc = "包含项目源码、配置文件等，将保持完整性"
-                elif group_name.startswith('program_'):
-                    group_type = "⚙️ 程序文件组"
-                    group_desc = "包含可执行文件及其依赖库、配置文件"
-                elif group_name.startswith('web_'):
-                    group_type = "🌐 网页文件组"
-                    group_desc = "包含HTML文件及相关的CSS、JS、图片资源"
-                elif group_name.startswith('media_'):
-                    group_type = "🎬 媒体文件组"
-                    group_desc = "包含视频文件及其字幕、海报等相关文件"
-                elif group_name.startswith('samename_'):
-                    group_type = "📋 同名文件组"
-                    group_desc = "相同名称但不同扩展名的文件"
-                
-                content += f"{group_type} ({group_info['file_count']} 个文件)\n"
-                content += f"    {group_desc}\n"
-                content += f"    主文件: {Path(group_info['main_file']).name}\n"
-                content += "    包含文件:\n"
-                for file_path in group_info['files']:
-                    content += f"      • {Path(file_path).name}\n"
-                content += "\n"
-        
-        text_widget.insert(tk.END, content)
+        # 逐组填充关联信息
+        enhanced_classifier = self._get_enhanced_classifier()
+        for index, (group_name, group_info) in enumerate(enhanced_classifier.iter_associations(file_groups), 1):
+            text_widget.insert(tk.END, _format_group(
+                group_info.kind, group_info.main_name, group_info.names))
+            if index % 100 == 0:
+                text_widget.update_idletasks()
         text_widget.config(state=tk.DISABLED)
         
         # 按钮框架
@@ -502,10 +687,10 @@ class FileClassifierApp:
         
         # 导出按钮
         export_btn = ttk.Button(button_frame, text="导出报告", 
-                               command=lambda: self.export_association_report(associations))
+                               command=lambda: self.export_association_report(file_groups))
         export_btn.pack(side=tk.RIGHT, padx=(0, 10))
     
-    def export_association_report(self, associations):
+    def export_association_report(self, file_groups):
         """导出关联分析报告"""
         try:
             from tkinter import filedialog
@@ -519,39 +704,28 @@ class FileClassifierApp:
             if not file_path:
                 return
             
-            # 生成报告内容
-            report_content = f"文件关联分析报告\n{'='*50}\n\n"
-            report_content += f"分析时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-            report_content += f"总文件数: {associations['total_files']}\n"
-            report_content += f"关联组数: {associations['total_groups']}\n\n"
-            
-            for group_name, group_info in associations['groups'].items():
-                if group_name == 'individual_files':
-                    report_content += f"独立文件 ({group_info['file_count']} 个文件)\n"
-                    report_content += "这些文件将按常规规则分类\n\n"
-                else:
-                    group_type = ""
-                    if group_name.startswith('project_'):
-                        group_type = "项目文件夹"
-                    elif group_name.startswith('program_'):
-                        group_type = "程序文件组"
-                    elif group_name.startswith('web_'):
-                        group_type = "网页文件组"
-                    elif group_name.startswith('media_'):
-                        group_type = "媒体文件组"
-                    elif group_name.startswith('samename_'):
-                        group_type = "同名文件组"
-                    
-                    report_content += f"{group_type} ({group_info['file_count']} 个文件)\n"
-                    report_content += f"主文件: {Path(group_info['main_file']).name}\n"
-                    report_content += "包含文件:\n"
-                    for file_path in group_info['files']:
-                        report_content += f"  - {Path(file_path).name}\n"
-                    report_content += "\n"
-            
-            # 写入文件
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(report_content)
+            # 生成报告内容并逐组写入文件（大缓冲区，文件对象本身即累加器）
+            with open(file_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.write(f"文件关联分析报告\n{'='*50}\n\n")
+                f.write(f"分析时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+                f.write(f"总文件数: {sum(len(files) for files in file_groups.values())}\n")
+                f.write(f"关联组数: {len(file_groups)}\n\n")
+                
+                enhanced_classifier = self._get_enhanced_classifier()
+                for group_name, group_info in enhanced_classifier.iter_associations(file_groups):
+                    if group_name == 'individual_files':
+                        f.write(f"独立文件 ({group_info.file_count} 个文件)\n")
+                        f.write("这些文件将按常规规则分类\n\n")
+                    else:
+                        kind = _group_kind(group_name)
+                        group_type = kind[1] if kind else ""
+                        
+                        # 每组拼成一段文本一次写入，不再逐行调用print
+                        f.write(f"{group_type} ({group_info.file_count} 个文件)\n"
+                                f"主文件: {group_info.main_name}\n"
+                                "包含文件:\n")
+                        f.write("".join(f"  - {name}\n" for name in group_info.names))
+                        f.write("\n")
             
             messagebox.showinfo("成功", f"关联分析报告已保存到:\n{file_path}")
             
@@ -576,9 +750,8 @@ class FileClassifierApp:
                                      f"目标文件夹: {self.target_var.get()}"):
                 return
         
-        # 在新线程中执行分类
-        thread = threading.Thread(target=self._classify_files_thread, daemon=True)
-        thread.start()
+        # 交给后台线程执行分类
+        self._job_queue.put(self._classify_files_thread)
         
     def _classify_files_thread(self):
         """在后台线程中执行文件分类"""
@@ -591,41 +764,44 @@ class FileClassifierApp:
             target_path = self.target_var.get()
             
             # 获取启用的规则
-            enabled_rules = [rule for rule, var in self.rule_vars.items() if var.get()]
+            enabled_rules = self._enabled_rules
             
-            # 获取配置
-            custom_rules = self.config_manager.get_custom_rules()
-            type_mapping = self.config_manager.get_file_type_mapping()
+            # 获取配置（一次读取）
+            snapshot = self.config_manager.snapshot()
+            custom_rules = snapshot.custom_rules
+            type_mapping = snapshot.type_mapping
             operation = self.operation_var.get()
             
             # 过滤启用的自定义规则
             enabled_custom_rules = [rule for rule in custom_rules if rule.get('enabled', True)]
             
+            # 清空结果列表，处理结果分批追加显示
+            self.message_queue.put(('reset_results', False))
+            
             # 执行分类 - 使用增强版分类器或原版分类器
-            if self.preserve_associations.get():
-                # 使用增强版分类器
-                if hasattr(self.classifier, 'classify_files_with_associations'):
-                    results = self.classifier.classify_files_with_associations(
-                        source_path, target_path, enabled_rules, operation,
-                        enabled_custom_rules, type_mapping, preserve_associations=True
-                    )
-                    self.message_queue.put(('status', '正在分析文件关联关系...'))
-                else:
-                    # 如果当前分类器不支持关联功能，回退到标准分类
+            if self.preserve_associations.get() and self._get_enhanced_classifier() is not None:
+                # 使用增强版分类器（在工作进程中执行，结果分批回传）
+                self.message_queue.put(('status', '正在分析文件关联关系...'))
+                results = self._run_association_classification(
+                    source_path, target_path, enabled_rules, operation,
+                    enabled_custom_rules, type_mapping
+                )
+            else:
+                if self.preserve_associations.get():
+                    # 如果增强版分类器不可用，回退到标准分类
                     self.message_queue.put(('status', '增强功能不可用，使用标准分类...'))
+                # 使用原版分类器
+                batcher = _ResultBatcher(self._post_result_batch)
+                try:
                     results = self.classifier.classify_files(
                         source_path, target_path, enabled_rules, operation,
-                        enabled_custom_rules, type_mapping
+                        enabled_custom_rules, type_mapping, progress_callback=batcher
                     )
-            else:
-                # 使用原版分类器
-                results = self.classifier.classify_files(
-                    source_path, target_path, enabled_rules, operation,
-                    enabled_custom_rules, type_mapping
-                )
+                finally:
+                    batcher.flush()
             
-            # 更新结果显示
-            self.message_queue.put(('update_results', results))
+            # 结果已逐批显示，最后只更新统计信息
+            self.message_queue.put(('statistics', results, False))
             
             # 统计关联保护信息
             association_count = sum(1 for r in results if r.get('association_preserved', False))
@@ -641,13 +817,104 @@ class FileClassifierApp:
             self.processing = False
             self.message_queue.put(('disable_buttons', False))
             
+    def _get_pool(self):
+        """获取关联分类的工作进程池，不存在（或上次已崩溃）时重新创建
+
+        界面进程是多线程的，fork不安全，因此使用spawn启动工作进程。
+        """
+        if self._pool is None:
+            context = multiprocessing.get_context('spawn')
+            self._progress_queue = context.Queue()
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=1, mp_context=context,
+                initializer=_init_classify_worker, initargs=(self._progress_queue,)
+            )
+        return self._pool
+    
+    def _discard_pool(self):
+        """丢弃已损坏的进程池，下次分类时重新创建"""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _post_result_batch(self, batch, is_preview=False):
+        """把一批新增结果交给界面线程追加显示（行数据在后台线程构建）"""
+        self.message_queue.put(('append_results', batch, self._build_result_rows(batch, is_preview)))
+    
+    def _post_preview_batch(self, batch):
+        """把一批新增预览结果交给界面线程追加显示"""
+        for result in batch:
+            result['preview_mode'] = True
+        self._post_result_batch(batch, True)
+    
+    def _run_association_classification(self, source_path, target_path, rules,
+                                        operation, custom_rules, type_mapping):
+        """在工作进程中执行关联分类，结果分批回传界面
+
+        工作进程无法启动时在当前线程执行；工作进程中途崩溃时，部分文件可能已被处理，
+        不再自动重试，而是报告错误由用户检查后重新执行。
+        """
+        classifier = self._get_enhanced_classifier()
+        try:
+            future = self._get_pool().submit(
+                _classify_worker, source_path, target_path, rules, operation,
+                custom_rules, type_mapping, self._flag_file_settings
+            )
+        except (OSError, BrokenProcessPool):
+            # 任务尚未开始执行，可以安全地在当前线程完成
+            self._discard_pool()
+            classifier.load_operation_history()
+            batcher = _ResultBatcher(self._post_result_batch)
+            try:
+                return classifier.classify_files_with_associations(
+                    source_path, target_path, rules, operation,
+                    custom_rules, type_mapping, preserve_associations=True,
+                    progress_callback=batcher
+                )
+            finally:
+                batcher.flush()
+                self._reload_operation_history()
+        
+        try:
+            self._forward_progress(future)
+            return future.result()
+        except BrokenProcessPool:
+            self._discard_pool()
+            raise RuntimeError("分类工作进程意外退出，部分文件可能已被移动或复制，"
+                               "请检查源文件夹和目标文件夹后重新执行")
+        finally:
+            # 操作历史由工作进程写入文件，重新加载以支持撤销
+            self._reload_operation_history()
+    
+    def _forward_progress(self, future, idle_timeout=1.0):
+        """转发工作进程回传的结果，直到收到结束标记或工作进程异常退出"""
+        progress_queue = self._progress_queue
+        idle_since = None
+        while True:
+            try:
+                batch = progress_queue.get(timeout=0.1)
+            except queue.Empty:
+                if not future.done():
+                    continue
+                if future.exception() is not None:
+                    return
+                # 任务已返回，给结束标记留出到达的时间
+                now = time.monotonic()
+                idle_since = idle_since or now
+                if now - idle_since >= idle_timeout:
+                    return
+                continue
+            if batch is None:
+                return
+            idle_since = None
+            self._post_result_batch(batch)
+        
     def preview_classification(self):
         """预览分类结果"""
         if not self.validate_inputs():
             return
             
-        thread = threading.Thread(target=self._preview_classification_thread, daemon=True)
-        thread.start()
+        self._job_queue.put(self._preview_classification_thread)
         
     def _preview_classification_thread(self):
         """在后台线程中生成预览"""
@@ -657,37 +924,41 @@ class FileClassifierApp:
             source_path = self.source_var.get()
             target_path = self.target_var.get()
             
-            enabled_rules = [rule for rule, var in self.rule_vars.items() if var.get()]
-            custom_rules = self.config_manager.get_custom_rules()
-            type_mapping = self.config_manager.get_file_type_mapping()
+            enabled_rules = self._enabled_rules
+            snapshot = self.config_manager.snapshot()
+            custom_rules = snapshot.custom_rules
+            type_mapping = snapshot.type_mapping
             
             enabled_custom_rules = [rule for rule in custom_rules if rule.get('enabled', True)]
             
+            # 清空结果列表，预览结果分批追加显示
+            self.message_queue.put(('reset_results', True))
+            batcher = _ResultBatcher(self._post_preview_batch)
+            
             # 生成预览 - 使用增强版或原版分类器
-            if self.preserve_associations.get():
-                if hasattr(self.classifier, 'classify_files_with_associations'):
+            enhanced_classifier = self._get_enhanced_classifier() if self.preserve_associations.get() else None
+            try:
+                if enhanced_classifier is not None:
                     # 增强版分类器暂时使用复制模式生成预览
-                    preview_results = self.classifier.classify_files_with_associations(
-                        source_path, target_path, enabled_rules, 'copy',
-                        enabled_custom_rules, type_mapping, preserve_associations=True
-                    )
-                    # 将结果标记为预览模式
-                    for result in preview_results:
-                        result['preview_mode'] = True
+                    enhanced_classifier.load_operation_history()
+                    try:
+                        preview_results = enhanced_classifier.classify_files_with_associations(
+                            source_path, target_path, enabled_rules, 'copy',
+                            enabled_custom_rules, type_mapping, preserve_associations=True,
+                            progress_callback=batcher
+                        )
+                    finally:
+                        self._reload_operation_history()
                 else:
-                    # 回退到原版分类器
+                    # 使用原版分类器（增强版不可用时也回退到原版）
                     preview_results = self.classifier.preview_classification(
                         source_path, target_path, enabled_rules, 
-                        enabled_custom_rules, type_mapping
+                        enabled_custom_rules, type_mapping, progress_callback=batcher
                     )
-            else:
-                # 使用原版分类器
-                preview_results = self.classifier.preview_classification(
-                    source_path, target_path, enabled_rules, 
-                    enabled_custom_rules, type_mapping
-                )
+            finally:
+                batcher.flush()
             
-            self.message_queue.put(('update_results', preview_results, True))
+            self.message_queue.put(('statistics', preview_results, True))
             self.message_queue.put(('status', f'预览完成，共 {len(preview_results)} 个文件'))
             
         except Exception as e:
@@ -706,10 +977,14 @@ class FileClassifierApp:
             messagebox.showwarning("警告", "请先选择源文件夹")
             return
             
+        if not self._exists_cached(self.source_var.get()):
+            messagebox.showerror("错误", "源文件夹不存在")
+            return
+            
         try:
             source_path = self.source_var.get()
             target_path = self.target_var.get() or source_path
-            enabled_rules = [rule for rule, var in self.rule_vars.items() if var.get()]
+            enabled_rules = self._enabled_rules
             operation = self.operation_var.get()
             
             # 创建监控器
@@ -758,8 +1033,8 @@ class FileClassifierApp:
             
             self.monitor_stats_var.set(stats_text)
             
-            # 5秒后再次更新
-            self.root.after(5000, self.update_monitor_stats)
+            # 5秒后由消息循环再次更新
+            self._next_monitor_stats = time.monotonic() + self.MONITOR_STATS_INTERVAL
             
     def validate_inputs(self):
         """验证输入"""
@@ -767,11 +1042,11 @@ class FileClassifierApp:
             messagebox.showwarning("警告", "请选择源文件夹")
             return False
             
-        if not os.path.exists(self.source_var.get()):
+        if not self._exists_cached(self.source_var.get()):
             messagebox.showerror("错误", "源文件夹不存在")
             return False
             
-        if not any(var.get() for var in self.rule_vars.values()):
+        if not self._enabled_rules:
             messagebox.showwarning("警告", "请至少选择一种分类规则")
             return False
             
@@ -785,84 +1060,163 @@ class FileClassifierApp:
                 
         return True
         
-    def update_results(self, results, is_preview=False):
-        """更新结果显示"""
-        # 清空现有结果
-        for item in self.result_tree.get_children():
-            self.result_tree.delete(item)
-            
-        # 添加新结果
-        for result in results:
-            self.add_result_item(result, is_preview)
+    def update_results(self, results, is_preview=False, rows=None, reset=False):
+        """更新结果显示，rows 为后台线程预先构建的行数据
+
+        reset为True时回到列表顶部，否则保留当前滚动位置（超出新长度时自动收回）。
+        """
+        if rows is None:
+            rows = self._build_result_rows(results, is_preview)
+        self._results = list(results)
+        self._result_rows = list(rows)
+        
+        # 数据整体替换后原来按行号保存的选中项已不对应原记录
+        self._clear_result_selection()
+        if reset:
+            self._view_first = 0
+        self._refresh_result_view()
             
         # 更新统计信息
         self.update_statistics(results, is_preview)
         
-    def add_result_item(self, file_info, is_preview=False):
-        """添加单个结果项"""
-        try:
-            # 格式化文件大小
-            size = file_info.get('size', 0)
-            if size > 0:
-                size_str = self.format_file_size(size)
-            else:
-                size_str = "未知"
-                
-            # 格式化时间
-            timestamp = file_info.get('timestamp', '')
-            if timestamp:
-                try:
-                    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    time_str = dt.strftime('%H:%M:%S')
-                except:
-                    time_str = timestamp
-            else:
-                time_str = datetime.now().strftime('%H:%M:%S')
-                
-            # 确定状态颜色
-            status = file_info.get('status', '')
-            success = file_info.get('success', True)
-            
-            if is_preview:
-                status = "预览"
-                tags = ("preview",)
-            elif success:
-                tags = ("success",)
-            else:
-                tags = ("error",)
-                
-            # 插入项目
-            item = self.result_tree.insert('', 'end', values=(
-                file_info.get('filename', ''),
-                file_info.get('source', ''),
-                file_info.get('target', ''),
-                file_info.get('operation', ''),
-                status,
-                size_str,
-                time_str
-            ), tags=tags)
-            
-            # 配置标签样式
-            self.result_tree.tag_configure("success", foreground="green")
-            self.result_tree.tag_configure("error", foreground="red")
-            self.result_tree.tag_configure("preview", foreground="blue")
-            
-            # 自动滚动到最新项目
-            self.result_tree.see(item)
+    def append_results(self, file_infos, rows):
+        """追加结果并滚动到末尾（全量重置请使用update_results）"""
+        self._results.extend(file_infos)
+        self._result_rows.extend(rows)
+        self._view_first = len(self._result_rows)
+        self._refresh_result_view()
+        
+    def _clear_result_selection(self):
+        """清除结果列表的选中项和焦点"""
+        self.result_tree.selection_set(())
+        self.result_tree.focus('')
+        
+    def _visible_row_count(self):
+        """根据Treeview当前高度计算可见行数"""
+        height = self.result_tree.winfo_height()
+        if height <= 1:
+            return int(self.result_tree.cget('height'))
+        # 扣除表头高度
+        return max(1, (height - self._row_height - 4) // self._row_height)
+        
+    def _refresh_result_view(self):
+        """只在Treeview中渲染当前可见范围内的行"""
+        tree = self.result_tree
+        total = len(self._result_rows)
+        self._view_count = self._visible_row_count()
+        first = max(0, min(self._view_first, total - self._view_count))
+        last = min(total, first + self._view_count)
+        self._view_first = first
+        
+        selected = tree.selection()
+        children = tree.get_children()
+        if children:
+            tree.delete(*children)
+        
+        insert = tree.insert
+        rows = self._result_rows
+        for index in range(first, last):
+            values, tags = rows[index]
+            insert('', 'end', iid=str(index), values=values, tags=tags)
+        
+        # 保留仍在可见范围内的选中项
+        selected = [iid for iid in selected if first <= int(iid) < last]
+        if selected:
+            tree.selection_set(selected)
+        
+        if total:
+            self.result_scrollbar_y.set(first / total, last / total)
+        else:
+            self.result_scrollbar_y.set(0.0, 1.0)
+            
+    def _on_result_scroll(self, action, amount, unit=None):
+        """处理纵向滚动条操作"""
+        if action == 'moveto':
+            self._view_first = int(float(amount) * len(self._result_rows))
+        elif action == 'scroll':
+            step = self._view_count if unit == 'pages' else 1
+            self._view_first += int(amount) * step
+        self._refresh_result_view()
+        
+    def _on_result_mousewheel(self, event):
+        """处理鼠标滚轮"""
+        if event.num == 4 or event.delta > 0:
+            self._view_first -= 3
+        else:
+            self._view_first += 3
+        self._refresh_result_view()
+        return "break"
+        
+    def _on_result_tree_configure(self, event):
+        """窗口大小变化时重新计算可见行"""
+        if self._visible_row_count() != self._view_count:
+            self._refresh_result_view()
+        
+    def _build_result_rows(self, file_infos, is_preview=False):
+        """构建多个结果行（可在后台线程调用）"""
+        build_row = self._build_result_row
+        return [build_row(file_info, is_preview) for file_info in file_infos]
+        
+    def _build_result_row(self, file_info, is_preview=False):
+        """构建单个结果行的 (values, tags)"""
+        # 格式化文件大小
+        size = file_info.get('size', 0)
+        if size > 0:
+            size_str = self.format_file_size(size)
+        else:
+            size_str = "未知"
+            
+        # 格式化时间
+        timestamp = file_info.get('timestamp', '')
+        if timestamp:
+            # 同一秒内的时间戳共用一次解析结果
+            time_str = _format_timestamp(str(timestamp)[:19]) or timestamp
+        else:
+            time_str = time.strftime('%H:%M:%S')
             
+        # 确定状态颜色
+        status = file_info.get('status', '')
+        success = file_info.get('success', True)
+        
+        if is_preview:
+            status = "预览"
+            tags = ("preview",)
+        elif success:
+            tags = ("success",)
+        else:
+            tags = ("error",)
+            
+        values = (
+            file_info.get('filename', ''),
+            file_info.get('source', ''),
+            file_info.get('target', ''),
+            file_info.get('operation', ''),
+            status,
+            size_str,
+            time_str
+        )
+        return values, tags
+        
+    def add_result_items(self, file_infos, is_preview=False):
+        """批量添加结果项"""
+        try:
+            self.append_results(file_infos, self._build_result_rows(file_infos, is_preview))
         except Exception as e:
             print(f"添加结果项失败: {e}")
             
-    def format_file_size(self, size_bytes):
-        """格式化文件大小"""
+    def add_result_item(self, file_info, is_preview=False):
+        """添加单个结果项"""
+        self.add_result_items([file_info], is_preview)
+            
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def format_file_size(size_bytes):
+        """格式化文件大小（结果缓存，相同大小直接复用）"""
         if size_bytes == 0:
             return "0B"
-        size_names = ["B", "KB", "MB", "GB", "TB"]
-        i = 0
-        while size_bytes >= 1024 and i < len(size_names) - 1:
-            size_bytes /= 1024.0
-            i += 1
-        return f"{size_bytes:.1f}{size_names[i]}"
+        # 由二进制位数直接得到单位级别，每级10位（小于1字节的小数按字节显示）
+        i = max(0, min((int(size_bytes).bit_length() - 1) // 10, 4))
+        return f"{size_bytes / (1 << (i * 10)):.1f}{_SIZE_UNITS[i]}"
         
     def update_statistics(self, results, is_preview=False):
         """更新统计信息"""
@@ -874,9 +1228,14 @@ class FileClassifierApp:
         if is_preview:
             self.stats_label.config(text=f"预览: 共 {total_files} 个文件待处理")
         else:
-            success_count = sum(1 for r in results if r.get('success', False))
+            # 单次遍历统计成功数和总大小
+            success_count = 0
+            total_size = 0
+            for r in results:
+                if r.get('success', False):
+                    success_count += 1
+                    total_size += r.get('size', 0)
             failed_count = total_files - success_count
-            total_size = sum(r.get('size', 0) for r in results if r.get('success', False))
             
             stats_text = f"完成: {success_count} 成功, {failed_count} 失败, "
             stats_text += f"总大小: {self.format_file_size(total_size)}"
@@ -893,21 +1252,28 @@ class FileClassifierApp:
         if item:
             self.context_menu.post(event.x_root, event.y_root)
             
-    def open_source_folder(self):
-        """打开源文件夹"""
+    def _selected_result(self):
+        """返回当前选中行对应的原始结果（行id即结果索引），未选中时返回None"""
         item = self.result_tree.selection()
         if item:
-            source_path = self.result_tree.item(item[0])['values'][1]
+            return self._results[int(item[0])]
+        return None
+        
+    def open_source_folder(self):
+        """打开源文件夹"""
+        file_info = self._selected_result()
+        if file_info:
+            source_path = file_info.get('source')
             if source_path:
-                self.open_folder_in_explorer(str(Path(source_path).parent))
+                self.open_folder_in_explorer(os.path.dirname(str(source_path)))
                 
     def open_target_folder(self):
         """打开目标文件夹"""
-        item = self.result_tree.selection()
-        if item:
-            target_path = self.result_tree.item(item[0])['values'][2]
+        file_info = self._selected_result()
+        if file_info:
+            target_path = file_info.get('target')
             if target_path:
-                self.open_folder_in_explorer(str(Path(target_path).parent))
+                self.open_folder_in_explorer(os.path.dirname(str(target_path)))
                 
     def open_folder_in_explorer(self, path):
         """在文件管理器中打开文件夹"""
@@ -921,12 +1287,12 @@ class FileClassifierApp:
             
     def copy_path(self):
         """复制路径到剪贴板"""
-        item = self.result_tree.selection()
-        if item:
-            target_path = self.result_tree.item(item[0])['values'][2]
+        file_info = self._selected_result()
+        if file_info:
+            target_path = file_info.get('target')
             if target_path:
                 self.root.clipboard_clear()
-                self.root.clipboard_append(target_path)
+                self.root.clipboard_append(str(target_path))
                 self.status_var.set("路径已复制到剪贴板")
                 
     def delete_record(self):
@@ -934,13 +1300,20 @@ class FileClassifierApp:
         item = self.result_tree.selection()
         if item:
             if messagebox.askyesno("确认", "确定要删除这条记录吗？"):
-                self.result_tree.delete(item[0])
+                index = int(item[0])
+                del self._results[index]
+                del self._result_rows[index]
+                # 行标识就是行号，删除后后面的行会前移，必须清除选中和焦点
+                self._clear_result_selection()
+                self._refresh_result_view()
                 
     def clear_results(self):
         """清空结果"""
         if messagebox.askyesno("确认", "确定要清空所有结果吗？"):
-            for item in self.result_tree.get_children():
-                self.result_tree.delete(item)
+            self._results.clear()
+            self._result_rows.clear()
+            self._view_first = 0
+            self._refresh_result_view()
             self.stats_label.config(text="准备就绪")
             self.progress_var.set(0)
             
@@ -975,7 +1348,8 @@ class FileClassifierApp:
                 return
         
         try:
-            # 打开智能推荐对话框
+            # 打开智能推荐对话框（首次打开时才导入推荐引擎）
+            from recommendations_dialog import show_recommendations_dialog
             show_recommendations_dialog(self.root, source_path)
         except Exception as e:
             messagebox.showerror("错误", f"打开智能推荐失败: {str(e)}")
@@ -993,7 +1367,10 @@ class FileClassifierApp:
     def undo_last_operation(self):
         """撤销上次操作"""
         try:
+            # 以历史文件为准撤销，撤销后同步增强版分类器的内存记录
+            self.classifier.load_operation_history()
             success, message = self.classifier.undo_last_operation()
+            self._reload_operation_history()
             if success:
                 messagebox.showinfo("成功", message)
                 self.status_var.set(message)
@@ -1007,13 +1384,15 @@ class FileClassifierApp:
         config = self.config_manager.load_config()
         
         # 加载标志文件设置
-        if hasattr(self.classifier, 'respect_flag_file'):
-            flag_file_config = config.get('flag_file', {
-                'enabled': True,
-                'name': '.noclassify'
-            })
-            self.classifier.respect_flag_file = flag_file_config.get('enabled', True)
-            self.classifier.flag_file_name = flag_file_config.get('name', '.noclassify')
+        flag_file_config = config.get('flag_file', {
+            'enabled': True,
+            'name': '.noclassify'
+        })
+        self._flag_file_settings = (flag_file_config.get('enabled', True),
+                                    flag_file_config.get('name', '.noclassify'))
+        if self._enhanced_classifier is not None:
+            classifier = self._enhanced_classifier
+            classifier.respect_flag_file, classifier.flag_file_name = self._flag_file_settings
         
         # 设置路径
         self.source_var.set(config.get('source_path', ''))
@@ -1041,11 +1420,10 @@ class FileClassifierApp:
         config = self.config_manager.load_config()
         
         # 保存标志文件设置
-        if hasattr(self.classifier, 'respect_flag_file'):
-            config['flag_file'] = {
-                'enabled': self.classifier.respect_flag_file,
-                'name': self.classifier.flag_file_name
-            }
+        config['flag_file'] = {
+            'enabled': self._flag_file_settings[0],
+            'name': self._flag_file_settings[1]
+        }
         
         # 更新配置
         config['source_path'] = self.source_var.get()
@@ -1060,28 +1438,62 @@ class FileClassifierApp:
         
     def process_messages(self):
         """处理消息队列"""
+        handled = 0
+        last_status = None
         try:
-            while True:
+            while handled < self.MAX_MESSAGES_PER_TICK:
                 message = self.message_queue.get_nowait()
+                handled += 1
                 message_type = message[0]
                 
                 if message_type == 'status':
-                    self.status_var.set(message[1])
+                    # 只保留最后一条状态
+                    last_status = message[1]
                 elif message_type == 'error':
                     messagebox.showerror("错误", message[1])
-                elif message_type == 'update_results':
-                    is_preview = len(message) > 2 and message[2]
-                    self.update_results(message[1], is_preview)
+                elif message_type == 'reset_results':
+                    # 清空前丢弃尚未插入的分类/预览结果，监控结果保留
+                    self._pending_result_items = [item for item in self._pending_result_items
+                                                  if item[1] is None]
+                    self.update_results([], message[1], [], reset=True)
+                elif message_type == 'append_results':
+                    # 只携带新增的结果，连续的追加消息合并后一次插入
+                    self._pending_result_items.extend(zip(message[1], message[2]))
+                elif message_type == 'statistics':
+                    self.update_statistics(message[1], message[2])
                 elif message_type == 'add_result_item':
-                    self.add_result_item(message[1])
+                    # 先缓存，本轮结束后批量插入
+                    self._pending_result_items.append((message[1], None))
                 elif message_type == 'disable_buttons':
                     self.set_buttons_enabled(not message[1])
                     
         except queue.Empty:
             pass
         finally:
-            # 100ms后再次检查消息队列
-            self.root.after(100, self.process_messages)
+            if last_status is not None:
+                self.status_var.set(last_status)
+                
+            # 批量插入本轮收集的结果，超出上限的留到下一轮
+            if self._pending_result_items:
+                batch = self._pending_result_items[:self.MAX_INSERTS_PER_TICK]
+                del self._pending_result_items[:self.MAX_INSERTS_PER_TICK]
+                # 后台已构建好的行直接使用，监控结果在这里构建
+                build_row = self._build_result_row
+                self.append_results([info for info, _ in batch],
+                                    [row if row is not None else build_row(info)
+                                     for info, row in batch])
+            
+            # 监控期间定期刷新统计
+            if self.monitoring and time.monotonic() >= self._next_monitor_stats:
+                self.update_monitor_stats()
+            
+            # 根据负载调整下次检查的时间
+            if handled >= self.MAX_MESSAGES_PER_TICK or self._pending_result_items:
+                self._tick_id = self.root.after(10, self.process_messages)
+            elif handled:
+                self._tick_id = self.root.after_idle(self.process_messages)
+            else:
+                self._tick_id = self.root.after(200, self.process_messages)
             
     def set_buttons_enabled(self, enabled):
         """设置按钮可用状态"""
@@ -1095,6 +1507,10 @@ class FileClassifierApp:
         """程序关闭时的清理工作"""
         self.stop_monitoring()
         self.save_config()
+        if self._tick_id is not None:
+            self.root.after_cancel(self._tick_id)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
         self.root.destroy()
 
 def main():
@@ -1118,4 +1534,6 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    # 打包为可执行文件后子进程需要此调用
+    multiprocessing.freeze_support()
     main() 
\ No newline at end of file
@@ -8,30 +8,304 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
+import json
 import threading
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
+from collections import OrderedDict
 
 from intelligent_recommendations import IntelligentRecommendationEngine
 
+# 回收站支持（可选依赖）
+try:
+    from send2trash import send2trash as _send2trash
+    SEND2TRASH_AVAILABLE = True
+except ImportError:
+    _send2trash = None
+    SEND2TRASH_AVAILABLE = False
+
+# 可选的高速JSON序列化库
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _trash_one(path):
+    """把单个文件移到回收站"""
+    if not SEND2TRASH_AVAILABLE:
+        raise RuntimeError("未安装send2trash，无法移到回收站")
+    _send2trash(path)
+
+
+def _remove_one(remove_func, path):
+    """删除单个文件，返回 (路径, 是否成功, 错误)，供线程池调用"""
+    try:
+        remove_func(path)
+        return path, True, None
+    except Exception as e:
+        return path, False, e
+
+
+def _file_unchanged(path: str, size, mtime) -> bool:
+    """文件仍存在且大小、修改时间与报告记录一致"""
+    if size is None or mtime is None:
+        return False
+    try:
+        stat = os.stat(path, follow_symlinks=False)
+    except OSError:
+        return False
+    return stat.st_size == size and stat.st_mtime == mtime
+
+
+def _unchanged_since_report(item: Dict[str, Any]) -> bool:
+    """报告生成后文件（以及重复文件的原件）未被修改，可以安全地执行清理"""
+    if not _file_unchanged(item['path'], item.get('size'), item.get('modified_time')):
+        return False
+    original = item.get('original')
+    return original is None or _file_unchanged(
+        original, item.get('original_size'), item.get('original_modified_time'))
+
+
+# 优先级 -> 图标
+_PRIORITY_ICON = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}
+
+
+def _file_name(item: Dict[str, Any], basename=os.path.basename) -> str:
+    """清理建议的文件名：引擎已记录文件名，旧报告没有时再从路径中取"""
+    return item.get('name') or basename(item['path'])
+
+
+def _duplicate_row(item: Dict[str, Any], basename=os.path.basename) -> tuple:
+    """重复文件行"""
+    return (_file_name(item), '%.1f KB' % (item['size'] / 1024),
+            basename(item.get('original', 'N/A')), "删除")
+
+
+def _temp_file_row(item: Dict[str, Any]) -> tuple:
+    """临时文件行"""
+    return (_file_name(item), '%.1f KB' % (item['size'] / 1024),
+            item.get('reason', 'N/A'), "删除")
+
+
+def _large_file_row(item: Dict[str, Any]) -> tuple:
+    """大文件行"""
+    return (_file_name(item), '%.1f' % item.get('size_mb', 0),
+            item.get('reason', 'N/A'), "归档")
+
+
+def _old_file_row(item: Dict[str, Any]) -> tuple:
+    """旧文件行"""
+    return (_file_name(item), str(item.get('days_old', 0)),
+            '%.1f KB' % (item['size'] / 1024), "归档")
+
+
+class VirtualTree:
+    """虚拟化的Treeview：完整数据保存在列表中，只插入当前可见的行
+
+    行id为数据索引的字符串，滚动条和滚轮由本类接管。
+    """
+    
+    def __init__(self, tree: ttk.Treeview, scrollbar: ttk.Scrollbar):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.data: List[Any] = []
+        self.value_func = None
+        self.first = 0
+        self.count = int(tree.cget('height'))
+        self.row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        
+        scrollbar.configure(command=self._on_scroll)
+        tree.bind("<Configure>", self._on_configure)
+        tree.bind("<MouseWheel>", self._on_mousewheel)
+        tree.bind("<Button-4>", self._on_mousewheel)
+        tree.bind("<Button-5>", self._on_mousewheel)
+    
+    def set_data(self, data: List[Any], value_func):
+        """替换全部数据并回到顶部（复制一份，忽略行不影响原报告）"""
+        self.data = list(data)
+        self.value_func = value_func
+        self.first = 0
+        self.refresh()
+    
+    def items(self, iids) -> List[Any]:
+        """返回行id对应的数据项"""
+        return [self.data[int(iid)] for iid in iids]
+    
+    def remove(self, iids):
+        """从数据中移除若干行"""
+        for index in sorted((int(iid) for iid in iids), reverse=True):
+            del self.data[index]
+        self.tree.selection_set(())
+        self.refresh()
+    
+    def _visible_count(self) -> int:
+        """根据当前高度计算可见行数"""
+        height = self.tree.winfo_height()
+        if height <= 1:
+            return int(self.tree.cget('height'))
+        # 扣除表头高度
+        return max(1, (height - self.row_height - 4) // self.row_height)
+    
+    def refresh(self):
+        """重新插入可见范围内的行"""
+        tree = self.tree
+        total = len(self.data)
+        self.count = self._visible_count()
+        first = max(0, min(self.first, total - self.count))
+        last = min(total, first + self.count)
+        self.first = first
+        
+        selected = tree.selection()
+        children = tree.get_children()
+        if children:
+            tree.delete(*children)
+        
+        insert = tree.insert
+        value_func = self.value_func
+        data = self.data
+        for index in range(first, last):
+            insert('', 'end', iid=str(index), values=value_func(data[index]))
+        
+        # 保留仍在可见范围内的选中项
+        selected = [iid for iid in selected if first <= int(iid) < last]
+        if selected:
+            tree.selection_set(selected)
+        
+        if total:
+            self.scrollbar.set(first / total, last / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def _on_scroll(self, action, amount, unit=None):
+        """处理滚动条操作"""
+        if action == 'moveto':
+            self.first = int(float(amount) * len(self.data))
+        elif action == 'scroll':
+            step = self.count if unit == 'pages' else 1
+            self.first += int(amount) * step
+        self.refresh()
+    
+    def _on_mousewheel(self, event):
+        """处理鼠标滚轮"""
+        if event.num == 4 or event.delta > 0:
+            self.first -= 3
+        else:
+            self.first += 3
+        self.refresh()
+        return "break"
+    
+    def _on_configure(self, event):
+        """大小变化时重新计算可见行"""
+        if self._visible_count() != self.count:
+            self.refresh()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_recommendation_engine() -> IntelligentRecommendationEngine:
+    """获取进程内共享的推荐引擎"""
+    return IntelligentRecommendationEngine()
+
+
+def _directory_signature(directory: str) -> tuple:
+    """目录树的廉价签名：各级目录的最大修改时间、子目录数和条目总数
+
+    只读取目录、不对普通文件做stat。任一层级中增删或重命名文件都会改变签名，
+    但就地修改文件内容不会改变所在目录的修改时间，签名无法发现这类变化，
+    因此缓存的报告另有有效期，执行清理前也会逐个文件重新核对；
+    “刷新分析”会跳过缓存重新生成报告。
+    """
+    max_mtime = os.stat(directory).st_mtime_ns
+    dir_count = 0
+    entry_count = 0
+    stack = [directory]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    entry_count += 1
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dir_count += 1
+                            stack.append(entry.path)
+                            max_mtime = max(max_mtime, entry.stat(follow_symlinks=False).st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return max_mtime, dir_count, entry_count
+
+
+# 分类建议的候选位置
+_POSSIBLE_LOCATIONS = (
+    "Documents/工作文档",
+    "Documents/个人文档",
+    "Pictures/照片",
+    "Downloads/下载",
+    "Archive/归档",
+    "Projects/项目",
+    "Media/媒体文件",
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_suggestions(file_path: str, mtime_ns: int, size: int,
+                        behavior_version: int) -> List[Dict[str, Any]]:
+    """按文件路径和状态缓存分类建议；文件变化或用户偏好更新后自动失效"""
+    return _get_recommendation_engine().get_classification_suggestions(file_path, _POSSIBLE_LOCATIONS)
+
+
+# 推荐报告缓存：(目录, 签名) -> (生成时间, 报告)，最多保留_REPORT_CACHE_SIZE份
+# 签名发现不了文件内容的就地修改，报告超过_REPORT_CACHE_TTL秒后重新生成，
+# 执行清理前仍必须逐个文件重新核对
+_REPORT_CACHE_SIZE = 32
+_REPORT_CACHE_TTL = 300.0
+_report_cache: "OrderedDict[tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_report_cache_lock = threading.Lock()
+
+
+def _clear_report_cache():
+    """文件被修改后丢弃所有缓存的报告"""
+    with _report_cache_lock:
+        _report_cache.clear()
+
+
+def _cached_report(directory: str, signature: tuple, progress_cb=None) -> Dict[str, Any]:
+    """按 (目录, 签名) 缓存推荐报告，目录未变化且未过期时直接复用
+
+    不用lru_cache，因为进度回调不能参与缓存键。
+    """
+    key = (directory, signature)
+    with _report_cache_lock:
+        cached = _report_cache.get(key)
+        if cached is not None:
+            if time.monotonic() - cached[0] < _REPORT_CACHE_TTL:
+                _report_cache.move_to_end(key)
+                return cached[1]
+            del _report_cache[key]
+    
+    # 生成报告耗时较长，不持有锁
+    report = _get_recommendation_engine().generate_recommendations_report(
+        directory, progress_cb=progress_cb)
+    with _report_cache_lock:
+        _report_cache[key] = (time.monotonic(), report)
+        if len(_report_cache) > _REPORT_CACHE_SIZE:
+            _report_cache.popitem(last=False)
+    return report
+
 class RecommendationsDialog:
     """智能推荐对话框"""
     
     def __init__(self, parent, initial_directory: str = ""):
         self.parent = parent
-        self.recommendation_engine = IntelligentRecommendationEngine()
         self.current_directory = initial_directory
         self.current_report = None
         
-        # 导入分类器，用于一键执行
-        try:
-            from file_classifier_enhanced import EnhancedFileClassifier
-            self.classifier = EnhancedFileClassifier()
-        except ImportError:
-            from file_classifier import FileClassifier
-            self.classifier = FileClassifier()
-        
         # 创建对话框窗口
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("智能推荐助手")
@@ -48,6 +322,21 @@ class RecommendationsDialog:
         if initial_directory and os.path.exists(initial_directory):
             self.analyze_directory()
     
+    @functools.cached_property
+    def recommendation_engine(self) -> IntelligentRecommendationEngine:
+        """推荐引擎（首次使用时创建）"""
+        return _get_recommendation_engine()
+    
+    @functools.cached_property
+    def classifier(self):
+        """用于一键执行的分类器，首次使用时才导入"""
+        try:
+            from file_classifier_enhanced import EnhancedFileClassifier
+            return EnhancedFileClassifier()
+        except ImportError:
+            from file_classifier import FileClassifier
+            return FileClassifier()
+    
     def setup_ui(self):
         """设置用户界面"""
         # 主框架
@@ -132,19 +421,41 @@ class RecommendationsDialog:
         scrollbar = ttk.Scrollbar(summary_frame, orient="vertical", command=canvas.yview)
         scrollable_frame = ttk.Frame(canvas)
         
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
+        # 刷新内容时会连续触发多次<Configure>，合并到空闲时只计算一次滚动区域
+        self.summary_canvas = canvas
+        self._scroll_pending = False
+        scrollable_frame.bind("<Configure>", self._schedule_scrollregion)
         
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
         canvas.configure(yscrollcommand=scrollbar.set)
         
         self.summary_content = scrollable_frame
         
+        # 汇总内容的标签常驻，刷新时只更新文本
+        stats_frame = ttk.LabelFrame(scrollable_frame, text="📈 总体统计", padding="10")
+        stats_frame.pack(fill=tk.X, pady=(0, 10))
+        self.summary_var = tk.StringVar()
+        ttk.Label(stats_frame, textvariable=self.summary_var, justify=tk.LEFT).pack(anchor=tk.W)
+        
+        self.recommendations_frame = ttk.LabelFrame(scrollable_frame, text="🎯 推荐操作", padding="10")
+        self.rec_text = tk.Text(self.recommendations_frame, height=8, wrap='word', state='disabled',
+                                relief=tk.FLAT, undo=False)
+        self.rec_text.pack(fill=tk.X)
+        
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
     
+    def _schedule_scrollregion(self, event=None):
+        """在空闲时更新汇总页的滚动区域"""
+        if not self._scroll_pending:
+            self._scroll_pending = True
+            self.dialog.after_idle(self._apply_scrollregion)
+    
+    def _apply_scrollregion(self):
+        """按当前内容重新计算汇总页的滚动区域"""
+        self._scroll_pending = False
+        self.summary_canvas.configure(scrollregion=self.summary_canvas.bbox("all"))
+    
     def setup_cleanup_tab(self):
         """设置清理建议页面"""
         cleanup_frame = ttk.Frame(self.notebook)
@@ -238,26 +549,26 @@ class RecommendationsDialog:
         suggestions_scrollbar.pack(side="right", fill="y")
     
     def create_tree_tab(self, parent, tab_name: str, columns: List[str]):
-        """创建树形视图标签页"""
+        """创建树形视图标签页，返回虚拟化的VirtualTree"""
         frame = ttk.Frame(parent)
         parent.add(frame, text=tab_name)
         
-        tree = ttk.Treeview(frame, columns=columns, show="headings", height=12)
+        tree = ttk.Treeview(frame, columns=columns, show="headings", height=12, selectmode='extended')
         
         for col in columns:
             tree.heading(col, text=col)
             tree.column(col, width=150)
         
-        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(frame, orient="vertical")
+        vtree = VirtualTree(tree, scrollbar)
         
         tree.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
         # 绑定右键菜单
-        tree.bind("<Button-3>", lambda e: self.show_context_menu(e, tree))
+        tree.bind("<Button-3>", lambda e: self.show_context_menu(e, tree, vtree))
         
-        return tree
+        return vtree
     
     def setup_button_frame(self, parent):
         """设置底部按钮框架"""
@@ -269,7 +580,7 @@ class RecommendationsDialog:
         left_buttons.pack(side=tk.LEFT)
         
         ttk.Button(left_buttons, text="导出报告", command=self.export_report).pack(side=tk.LEFT, padx=(0, 5))
-        ttk.Button(left_buttons, text="刷新分析", command=self.analyze_directory).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(left_buttons, text="刷新分析", command=lambda: self.analyze_directory(force=True)).pack(side=tk.LEFT, padx=(0, 5))
         
         # 中间按钮 - 一键执行
         center_buttons = ttk.Frame(button_frame)
@@ -302,19 +613,21 @@ class RecommendationsDialog:
             self.directory_var.set(directory)
             self.current_directory = directory
     
-    def analyze_directory(self):
-        """分析目录"""
+    def analyze_directory(self, force: bool = False):
+        """分析目录（force为True时忽略缓存的报告）"""
         directory = self.directory_var.get().strip()
         if not directory or not os.path.exists(directory):
             messagebox.showerror("错误", "请选择有效的目录路径")
             return
         
         self.current_directory = directory
+        if force:
+            _clear_report_cache()
         
         # 在后台线程中执行分析
         self.analyze_btn.configure(state="disabled")
         self.progress_var.set("正在分析...")
-        self.progress_bar.start()
+        self.progress_bar.configure(mode='determinate', maximum=100, value=0)
         
         thread = threading.Thread(target=self._analyze_directory_thread)
         thread.daemon = True
@@ -323,8 +636,10 @@ class RecommendationsDialog:
     def _analyze_directory_thread(self):
         """后台分析线程"""
         try:
-            # 生成推荐报告
-            self.current_report = self.recommendation_engine.generate_recommendations_report(self.current_directory)
+            # 生成推荐报告（目录未变化时复用缓存）
+            directory = os.path.abspath(self.current_directory)
+            self.current_report = _cached_report(directory, _directory_signature(directory),
+                                                 self._report_progress)
             
             # 在主线程中更新界面
             self.dialog.after(0, self._update_results)
@@ -332,6 +647,15 @@ class RecommendationsDialog:
         except Exception as e:
             self.dialog.after(0, lambda: self._analysis_error(str(e)))
     
+    def _report_progress(self, done: int, total: int):
+        """分析进度回调（后台线程调用），转交主线程更新进度条"""
+        self.dialog.after(0, self._show_progress, done, total)
+    
+    def _show_progress(self, done: int, total: int):
+        """显示分析进度"""
+        self.progress_var.set(f"正在分析... {done}/{total}")
+        self.progress_bar.configure(value=100 * done / max(total, 1))
+    
     def _update_results(self):
         """更新分析结果界面"""
         if not self.current_report:
@@ -364,22 +688,19 @@ class RecommendationsDialog:
     
     def update_summary_tab(self):
         """更新汇总页面"""
-        # 清除现有内容
-        for widget in self.summary_content.winfo_children():
-            widget.destroy()
-        
         if not self.current_report:
+            self.summary_var.set("")
+            self.recommendations_frame.pack_forget()
             return
         
         summary = self.current_report.get('summary', {})
+        # 报告时间为isoformat字符串，取到秒即为显示格式
+        timestamp = self.current_report.get('timestamp') or datetime.now().isoformat()
         
         # 总体统计
-        stats_frame = ttk.LabelFrame(self.summary_content, text="📈 总体统计", padding="10")
-        stats_frame.pack(fill=tk.X, pady=(0, 10))
-        
         stats_text = f"""
 📁 分析目录: {self.current_report.get('directory', 'N/A')}
-🕐 分析时间: {datetime.fromisoformat(self.current_report.get('timestamp', datetime.now().isoformat())).strftime('%Y-%m-%d %H:%M:%S')}
+🕐 分析时间: {timestamp[:19].replace('T', ' ')}
 
 🔄 重复文件: {summary.get('total_duplicates', 0)} 个
 🗑️ 临时文件: {summary.get('total_temp_files', 0)} 个
@@ -390,19 +711,22 @@ class RecommendationsDialog:
 
 💾 潜在节省空间: {summary.get('potential_space_savings_mb', 0)} MB
         """.strip()
-        
-        ttk.Label(stats_frame, text=stats_text, justify=tk.LEFT).pack(anchor=tk.W)
+        self.summary_var.set(stats_text)
         
         # 推荐操作
         recommendations = self.current_report.get('recommendations', [])
         if recommendations:
-            rec_frame = ttk.LabelFrame(self.summary_content, text="🎯 推荐操作", padding="10")
-            rec_frame.pack(fill=tk.X)
-            
+            lines = []
             for i, rec in enumerate(recommendations[:5], 1):
-                priority_color = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(rec.get('priority', 'low'), '⚪')
-                rec_text = f"{i}. {priority_color} {rec.get('description', 'N/A')} - {rec.get('impact', 'N/A')}"
-                ttk.Label(rec_frame, text=rec_text, justify=tk.LEFT).pack(anchor=tk.W, pady=2)
+                priority_color = _PRIORITY_ICON.get(rec.get('priority', 'low'), '⚪')
+                lines.append(f"{i}. {priority_color} {rec.get('description', 'N/A')} - {rec.get('impact', 'N/A')}")
+            self.rec_text.configure(state='normal')
+            self.rec_text.delete('1.0', tk.END)
+            self.rec_text.insert('1.0', "\n".join(lines))
+            self.rec_text.configure(state='disabled')
+            self.recommendations_frame.pack(fill=tk.X)
+        else:
+            self.recommendations_frame.pack_forget()
     
     def update_cleanup_tabs(self):
         """更新清理建议标签页"""
@@ -411,74 +735,38 @@ class RecommendationsDialog:
         
         cleanup = self.current_report.get('cleanup_suggestions', {})
         
-        # 更新重复文件
-        self.update_tree_data(self.duplicates_tree, cleanup.get('duplicates', []), 
-                             lambda item: [
-                                 os.path.basename(item['path']),
-                                 f"{item['size'] / 1024:.1f} KB",
-                                 os.path.basename(item.get('original', 'N/A')),
-                                 "删除"
-                             ])
-        
-        # 更新临时文件
-        self.update_tree_data(self.temp_files_tree, cleanup.get('temp_files', []),
-                             lambda item: [
-                                 os.path.basename(item['path']),
-                                 f"{item['size'] / 1024:.1f} KB",
-                                 item.get('reason', 'N/A'),
-                                 "删除"
-                             ])
-        
-        # 更新大文件
-        self.update_tree_data(self.large_files_tree, cleanup.get('large_files', []),
-                             lambda item: [
-                                 os.path.basename(item['path']),
-                                 f"{item.get('size_mb', 0):.1f}",
-                                 item.get('reason', 'N/A'),
-                                 "归档"
-                             ])
-        
-        # 更新旧文件
-        self.update_tree_data(self.old_files_tree, cleanup.get('old_files', []),
-                             lambda item: [
-                                 os.path.basename(item['path']),
-                                 str(item.get('days_old', 0)),
-                                 f"{item['size'] / 1024:.1f} KB",
-                                 "归档"
-                             ])
+        # 行在滚动到可见范围时才由对应的构建函数生成
+        self.update_tree_data(self.duplicates_tree, cleanup.get('duplicates', []), _duplicate_row)
+        self.update_tree_data(self.temp_files_tree, cleanup.get('temp_files', []), _temp_file_row)
+        self.update_tree_data(self.large_files_tree, cleanup.get('large_files', []), _large_file_row)
+        self.update_tree_data(self.old_files_tree, cleanup.get('old_files', []), _old_file_row)
     
     def update_reminders_tab(self):
         """更新整理提醒页面"""
         # 清除现有数据
-        for item in self.reminders_tree.get_children():
-            self.reminders_tree.delete(item)
+        self.reminders_tree.delete(*self.reminders_tree.get_children())
         
         if not self.current_report:
             return
         
         reminders = self.current_report.get('organization_reminders', [])
         
+        icon_get = _PRIORITY_ICON.get
+        insert = self.reminders_tree.insert
         for reminder in reminders:
             priority = reminder.get('priority', 'low')
-            priority_icon = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(priority, '⚪')
+            priority_icon = icon_get(priority, '⚪')
             
-            self.reminders_tree.insert('', 'end', values=[
+            insert('', 'end', values=[
                 f"{priority_icon} {priority.upper()}",
                 reminder.get('type', 'N/A'),
                 reminder.get('message', 'N/A'),
                 reminder.get('suggestion', 'N/A')
             ])
     
-    def update_tree_data(self, tree, data, value_func):
+    def update_tree_data(self, vtree, data, value_func):
         """更新树形视图数据"""
-        # 清除现有数据
-        for item in tree.get_children():
-            tree.delete(item)
-        
-        # 添加新数据
-        for item in data:
-            values = value_func(item)
-            tree.insert('', 'end', values=values)
+        vtree.set_data(data, value_func)
     
     def select_file_for_classification(self):
         """选择文件进行分类建议"""
@@ -493,24 +781,16 @@ class RecommendationsDialog:
     
     def get_classification_suggestions(self, file_path: str):
         """获取文件分类建议"""
-        # 模拟可能的位置列表
-        possible_locations = [
-            "Documents/工作文档",
-            "Documents/个人文档",
-            "Pictures/照片",
-            "Downloads/下载",
-            "Archive/归档",
-            "Projects/项目",
-            "Media/媒体文件"
-        ]
-        
-        suggestions = self.recommendation_engine.get_classification_suggestions(
-            file_path, possible_locations
-        )
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            suggestions = []
+        else:
+            suggestions = _cached_suggestions(file_path, stat.st_mtime_ns, stat.st_size,
+                                              self.recommendation_engine.behavior_version)
         
         # 清除现有建议
-        for item in self.suggestions_tree.get_children():
-            self.suggestions_tree.delete(item)
+        self.suggestions_tree.delete(*self.suggestions_tree.get_children())
         
         # 添加新建议
         for suggestion in suggestions:
@@ -522,23 +802,63 @@ class RecommendationsDialog:
                 suggestion['type']
             ])
     
-    def show_context_menu(self, event, tree):
+    def show_context_menu(self, event, tree, vtree=None):
         """显示右键菜单"""
-        item = tree.selection()[0] if tree.selection() else None
-        if not item:
+        selection = tree.selection()
+        if not selection:
             return
+        item = selection[0]
         
         context_menu = tk.Menu(self.dialog, tearoff=0)
         context_menu.add_command(label="查看详情", command=lambda: self.show_item_details(tree, item))
         context_menu.add_command(label="执行操作", command=lambda: self.execute_action(tree, item))
         context_menu.add_separator()
-        context_menu.add_command(label="忽略此项", command=lambda: tree.delete(item))
+        if vtree:
+            context_menu.add_command(label=f"删除选中 ({len(selection)})",
+                                     command=lambda: self.delete_selected(vtree, selection))
+            context_menu.add_command(label="忽略选中", command=lambda: vtree.remove(selection))
+        else:
+            context_menu.add_command(label="忽略此项", command=lambda: tree.delete(item))
         
         try:
             context_menu.tk_popup(event.x_root, event.y_root)
         finally:
             context_menu.grab_release()
     
+    def delete_selected(self, vtree, iids):
+        """把选中的文件一次性移到回收站"""
+        items = vtree.items(iids)
+        if not messagebox.askyesno("确认", f"确定要把选中的 {len(items)} 个文件移到回收站吗？"):
+            return
+        
+        paths = [item['path'] for item in items]
+        
+        def worker():
+            # 报告可能来自缓存，删除前重新核对文件状态
+            errors = []
+            unchanged = []
+            for item in items:
+                if _unchanged_since_report(item):
+                    unchanged.append(item['path'])
+                else:
+                    errors.append(f"文件在分析后已变化，已跳过 {item['path']}")
+            removed = self._remove_files(unchanged, _trash_one, errors, "删除文件")
+            self.dialog.after(0, self._on_selected_deleted, vtree, items, removed, errors)
+        
+        self.progress_var.set(f"正在删除 {len(paths)} 个文件...")
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def _on_selected_deleted(self, vtree, items, removed: int, errors: List[str]):
+        """删除选中文件完成后的回调"""
+        # 只从列表中去掉确实已不存在的文件（按对象查找，期间行号可能已变化）
+        gone = {id(item) for item in items if not os.path.lexists(item['path'])}
+        vtree.remove([index for index, item in enumerate(vtree.data) if id(item) in gone])
+        _clear_report_cache()
+        
+        self.progress_var.set(f"已删除 {removed} 个文件")
+        if errors:
+            messagebox.showwarning("部分失败", f"{len(errors)} 个文件删除失败：\n" + "\n".join(errors[:10]))
+    
     def show_item_details(self, tree, item):
         """显示项目详情"""
         values = tree.item(item)['values']
@@ -603,6 +923,7 @@ class RecommendationsDialog:
         # 在后台线程中执行操作
         self.execute_btn.configure(state="disabled")
         self.progress_var.set("正在执行推荐操作...")
+        self.progress_bar.configure(mode='indeterminate')
         self.progress_bar.start()
         
         thread = threading.Thread(target=self._execute_recommendations_thread)
@@ -623,22 +944,38 @@ class RecommendationsDialog:
             # 获取清理建议数据
             cleanup_suggestions = self.current_report.get('cleanup_suggestions', {})
             
-            # 1. 清理重复文件
+            # 同一个文件可能同时出现在多类建议中，按先后顺序去重，保证各阶段处理的文件互不重叠
             duplicates = cleanup_suggestions.get('duplicates', [])
-            if duplicates:
-                results['duplicates_removed'] = self._remove_duplicate_files(duplicates)
+            seen = {item['path'] for item in duplicates}
+            temp_files = [item for item in cleanup_suggestions.get('temp_files', [])
+                          if item['path'] not in seen]
+            seen.update(item['path'] for item in temp_files)
+            empty_files = [item for item in cleanup_suggestions.get('empty_files', [])
+                           if item['path'] not in seen]
             
-            # 2. 清理临时文件
-            temp_files = cleanup_suggestions.get('temp_files', [])
-            if temp_files:
-                results['temp_files_cleaned'] = self._clean_temp_files(temp_files)
+            # 报告可能来自缓存，报告生成后被修改过的文件一律跳过
+            errors = results['errors']
+            stages = []
+            for items in (duplicates, temp_files, empty_files):
+                unchanged = []
+                for item in items:
+                    if _unchanged_since_report(item):
+                        unchanged.append(item)
+                    else:
+                        errors.append(f"文件在分析后已变化，已跳过 {item['path']}")
+                stages.append(unchanged)
+            duplicates, temp_files, empty_files = stages
             
-            # 3. 清理空文件
-            empty_files = cleanup_suggestions.get('empty_files', [])
-            if empty_files:
-                results['empty_files_removed'] = self._clean_empty_files(empty_files)
+            # 1-3. 并行清理重复文件、临时文件和空文件
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                duplicates_future = executor.submit(self._remove_duplicate_files, duplicates, errors)
+                temp_future = executor.submit(self._clean_temp_files, temp_files, errors)
+                empty_future = executor.submit(self._clean_empty_files, empty_files, errors)
+                results['duplicates_removed'] = duplicates_future.result()
+                results['temp_files_cleaned'] = temp_future.result()
+                results['empty_files_removed'] = empty_future.result()
             
-            # 4. 执行智能分类
+            # 4. 执行智能分类（可能涉及上面清理的文件，必须在清理完成后执行）
             if self.current_directory:
                 results['files_classified'] = self._execute_smart_classification()
             
@@ -649,47 +986,41 @@ class RecommendationsDialog:
             error_msg = str(e)
             self.dialog.after(0, lambda: self._on_execution_error(error_msg))
     
-    def _remove_duplicate_files(self, duplicates: List[Dict]) -> int:
-        """移除重复文件"""
-        removed_count = 0
+    def _remove_files(self, paths: List[str], remove_func, errors: Optional[List[str]] = None,
+                      action: str = "删除文件") -> int:
+        """用线程池并发删除文件，返回成功数量，失败信息追加到errors"""
+        if not paths:
+            return 0
         
-        for duplicate_file in duplicates:
-            try:
-                file_path = duplicate_file['path']
-                import send2trash
-                send2trash.send2trash(file_path)
-                removed_count += 1
-                print(f"删除重复文件: {file_path}")
-            except Exception as e:
-                print(f"删除重复文件失败 {file_path}: {e}")
+        removed_count = 0
+        # 删除操作受系统调用限制，多线程可以并行等待
+        with ThreadPoolExecutor(max_workers=min(8, len(paths))) as executor:
+            futures = [executor.submit(_remove_one, remove_func, path) for path in paths]
+            for future in as_completed(futures):
+                path, ok, err = future.result()
+                if ok:
+                    removed_count += 1
+                else:
+                    print(f"{action}失败 {path}: {err}")
+                    if errors is not None:
+                        errors.append(f"{action}失败 {path}: {err}")
         
         return removed_count
     
-    def _clean_temp_files(self, temp_files: List[Dict]) -> int:
+    def _remove_duplicate_files(self, duplicates: List[Dict], errors: Optional[List[str]] = None) -> int:
+        """移除重复文件"""
+        paths = [duplicate_file['path'] for duplicate_file in duplicates]
+        return self._remove_files(paths, _trash_one, errors, "删除重复文件")
+    
+    def _clean_temp_files(self, temp_files: List[Dict], errors: Optional[List[str]] = None) -> int:
         """清理临时文件"""
-        cleaned_count = 0
-        for temp_file in temp_files:
-            try:
-                import send2trash
-                send2trash.send2trash(temp_file['path'])
-                cleaned_count += 1
-            except Exception as e:
-                print(f"清理临时文件失败 {temp_file['path']}: {e}")
-        
-        return cleaned_count
+        paths = [temp_file['path'] for temp_file in temp_files]
+        return self._remove_files(paths, _trash_one, errors, "清理临时文件")
     
-    def _clean_empty_files(self, empty_files: List[Dict]) -> int:
-        """清理空文件"""
-        removed_count = 0
-        for empty_file in empty_files:
-            try:
-                import os
-                os.remove(empty_file['path'])
-                removed_count += 1
-            except Exception as e:
-                print(f"清理空文件失败 {empty_file['path']}: {e}")
-        
-        return removed_count
+    def _clean_empty_files(self, empty_files: List[Dict], errors: Optional[List[str]] = None) -> int:
+        """清理空文件（调用前已用 _unchanged_since_report 确认文件仍存在且仍为空）"""
+        paths = [empty_file['path'] for empty_file in empty_files]
+        return self._remove_files(paths, os.unlink, errors, "清理空文件")
     
     def _execute_smart_classification(self):
         """执行智能分类"""
@@ -716,7 +1047,7 @@ class RecommendationsDialog:
                     'move'
                 )
             
-            return len([r for r in results if r.get('success', False)])
+            return sum(1 for r in results if r.get('success', False))
             
         except Exception as e:
             print(f"智能分类失败: {e}")
@@ -740,7 +1071,8 @@ class RecommendationsDialog:
         
         messagebox.showinfo("执行完成", result_msg)
         
-        # 刷新分析结果
+        # 文件已被修改，丢弃缓存的报告后重新分析
+        _clear_report_cache()
         self.analyze_directory()
     
     def _on_execution_error(self, error_msg):
@@ -765,9 +1097,14 @@ class RecommendationsDialog:
         
         if file_path:
             try:
-                import json
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(self.current_report, f, ensure_ascii=False, indent=2)
+                if ORJSON_AVAILABLE:
+                    data = orjson.dumps(self.current_report,
+                                        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+                    with open(file_path, 'wb') as f:
+                        f.write(data)
+                else:
+                    with open(file_path, 'w', encoding='utf-8') as f:
+                        json.dump(self.current_report, f, ensure_ascii=False, indent=2)
                 messagebox.showinfo("成功", f"报告已导出到: {file_path}")
             except Exception as e:
                 messagebox.showerror("错误", f"导出失败: {e}")
@@ -8,6 +8,7 @@
 import sys
 import os
 import subprocess
+from importlib.util import find_spec
 from pathlib import Path
 
 def check_python_version():
@@ -20,32 +21,27 @@ def check_python_version():
 
 def check_dependencies():
     """检查依赖包"""
-    required_packages = {
-        'watchdog': 'watchdog>=3.0.0',
-        'PIL': 'pillow>=9.0.0',
-        'send2trash': 'send2trash>=1.8.0'
-    }
+    required_packages = (
+        ('watchdog', 'watchdog>=3.0.0'),
+        ('PIL', 'pillow>=9.0.0'),
+        ('send2trash', 'send2trash>=1.8.0'),
+    )
     
-    missing_packages = []
-    
-    for package, pip_name in required_packages.items():
-        try:
-            __import__(package)
-        except ImportError:
-            missing_packages.append(pip_name)
-    
-    return missing_packages
+    # 只查找模块，不执行其初始化代码
+    return [pip_name for package, pip_name in required_packages
+            if find_spec(package) is None]
 
 def install_dependencies(packages):
     """安装缺失的依赖包"""
     print("正在安装缺失的依赖包...")
-    for package in packages:
-        print(f"安装 {package}...")
-        try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-        except subprocess.CalledProcessError as e:
-            print(f"安装 {package} 失败: {e}")
-            return False
+    print(f"安装 {', '.join(packages)}...")
+    # 一次调用pip，统一解析和下载所有依赖
+    try:
+        subprocess.check_call([sys.executable, "-m", "pip", "install",
+                               "--disable-pip-version-check", *packages])
+    except subprocess.CalledProcessError as e:
+        print(f"安装依赖失败: {e}（失败的包见上方pip输出）")
+        return False
     return True
 
 def main():
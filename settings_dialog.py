@@ -5,19 +5,62 @@
 提供高级配置选项和自定义规则管理
 """
 
+import copy
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from typing import Dict, List, Any
 
+# 关联组名前缀（如 project_0 中的 project）对应的显示名称
+_GROUP_TYPES = {
+    'project': "项目文件夹",
+    'program': "程序文件组",
+    'web': "网页文件组",
+    'media': "媒体文件组",
+    'samename': "同名文件组",
+}
+
+def _center_window(window, width, height):
+    """按已知尺寸把窗口居中，无需先强制完成一次布局"""
+    x = (window.winfo_screenwidth() - width) // 2
+    y = (window.winfo_screenheight() - height) // 2
+    window.geometry(f'{width}x{height}+{x}+{y}')
+
+def _set_checked(checkbutton, checked):
+    """设置复选框的勾选状态（复选框使用自带的Tcl变量，不另建BooleanVar）"""
+    value = checkbutton.cget('onvalue' if checked else 'offvalue')
+    checkbutton.setvar(str(checkbutton.cget('variable')), value)
+
 class SettingsDialog:
     """设置对话框类"""
     
+    __slots__ = ('parent', 'config_manager', 'dialog', 'notebook', 'status_label',
+                 'custom_rules', 'file_type_mapping',
+                 '_config', '_orig', '_built_tabs', '_tab_builders', '_tab_loaders',
+                 'type_tree', '_type_editor', 'rules_tree', '_rule_iids', '_rule_rows',
+                 'respect_flag_file_cb', 'flag_file_name', 'duplicate_var', 'monitor_subfolders_cb',
+                 'auto_start_monitoring_cb', 'monitor_delay_spin', 'parallel_processing_cb',
+                 'max_workers_spin', 'auto_create_folders_cb', 'preserve_timestamps_cb',
+                 'use_recycle_bin_cb', 'exclude_listbox', '_excl_var', 'exclude_entry',
+                 'min_file_size_var', 'max_file_size_var',
+                 'enable_program_association', 'enable_project_association',
+                 'enable_web_association', 'enable_media_association',
+                 'enable_samename_association', 'project_threshold', '_enhanced_classifier')
+    
+    DIALOG_SIZE = (800, 700)
+    
     def __init__(self, parent, config_manager):
         self.parent = parent
         self.config_manager = config_manager
         self.dialog = None
         self.custom_rules = []
+        self._rule_iids = []
+        self._rule_rows = []
         self.file_type_mapping = {}
+        self._config = None
+        self._orig = {}
+        self._enhanced_classifier = None
+        self._built_tabs = set()
         
         self.create_dialog()
         
@@ -25,21 +68,35 @@ class SettingsDialog:
         """创建对话框"""
         self.dialog = tk.Toplevel(self.parent)
         self.dialog.title("高级设置")
-        self.dialog.geometry("800x700")
+        self.dialog.geometry('%dx%d' % self.DIALOG_SIZE)
         self.dialog.resizable(True, True)
         self.dialog.transient(self.parent)
         self.dialog.grab_set()
         
         # 创建笔记本控件
-        notebook = ttk.Notebook(self.dialog)
-        notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        # 创建各个标签页
-        self.create_file_type_tab(notebook)
-        self.create_custom_rules_tab(notebook)
-        self.create_advanced_tab(notebook)
-        self.create_exclude_tab(notebook)
-        self.create_association_tab(notebook)
+        self.notebook = ttk.Notebook(self.dialog)
+        self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        # 各标签页先只放空框架，首次切换到该页时才创建控件
+        tabs = (
+            ('file_type', "文件类型", self.create_file_type_tab, self._load_file_type_tab),
+            ('custom_rules', "自定义规则", self.create_custom_rules_tab, self._load_custom_rules_tab),
+            ('advanced', "高级设置", self.create_advanced_tab, self._load_advanced_tab),
+            ('exclude', "排除设置", self.create_exclude_tab, self._load_exclude_tab),
+            ('association', "文件关联", self.create_association_tab, None),
+        )
+        self._tab_builders = {}
+        self._tab_loaders = {}
+        for key, title, builder, loader in tabs:
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=title)
+            self._tab_builders[str(frame)] = (key, frame, builder)
+            if loader:
+                self._tab_loaders[key] = loader
+                
+        # 只立即创建第一个标签页
+        self._build_tab(self.notebook.tabs()[0])
+        self.notebook.bind("<<NotebookTabChanged>>", self._lazy_build)
         
         # 按钮框架
         button_frame = ttk.Frame(self.dialog)
@@ -56,71 +113,111 @@ class SettingsDialog:
         ttk.Button(button_frame, text="导出配置", 
                   command=self.export_config).pack(side=tk.LEFT, padx=5)
         
+        # 操作成功的提示显示在这里，不再弹出阻塞的消息框
+        self.status_label = ttk.Label(button_frame, text='')
+        self.status_label.pack(side=tk.LEFT, padx=10)
+        
         # 加载当前设置
         self.load_settings()
         
         # 居中显示
         self.center_dialog()
         
-    def create_file_type_tab(self, notebook):
-        """创建文件类型映射标签页"""
-        frame = ttk.Frame(notebook)
-        notebook.add(frame, text="文件类型")
+    def _lazy_build(self, event=None):
+        """切换标签页时创建尚未创建的页面"""
+        self._build_tab(self.notebook.select())
+        
+    def _build_tab(self, tab_id):
+        """创建标签页控件（每页只创建一次），并把已加载的设置推送到控件"""
+        entry = self._tab_builders.pop(str(tab_id), None)
+        if entry is None:
+            return
+        key, frame, builder = entry
+        builder(frame)
+        self._built_tabs.add(key)
         
+        loader = self._tab_loaders.get(key)
+        if loader and self._config is not None:
+            loader(self._config)
+        
+    def create_file_type_tab(self, frame):
+        """创建文件类型映射标签页"""
         # 说明标签
         info_label = ttk.Label(frame, text="配置不同文件扩展名对应的分类文件夹")
         info_label.pack(anchor=tk.W, padx=10, pady=5)
         
-        # 创建滚动框架
-        canvas = tk.Canvas(frame)
-        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=canvas.yview)
-        self.type_frame = ttk.Frame(canvas)
+        # 类型映射表：每个类型一行，双击扩展名单元格编辑
+        tree_frame = ttk.Frame(frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        self.type_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
+        self.type_tree = ttk.Treeview(tree_frame, columns=("ext",), show="tree headings")
+        self.type_tree.heading("#0", text="类型")
+        self.type_tree.heading("ext", text="扩展名（逗号分隔）")
+        self.type_tree.column("#0", width=120, stretch=False)
+        self.type_tree.column("ext", width=500)
+        
+        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.type_tree.yview)
+        self.type_tree.configure(yscrollcommand=scrollbar.set)
         
-        canvas.create_window((0, 0), window=self.type_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        self.type_tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
         
-        canvas.pack(side="left", fill="both", expand=True, padx=10, pady=5)
-        scrollbar.pack(side="right", fill="y", pady=5)
+        self.type_tree.bind("<Double-1>", self.edit_type_extensions)
         
-        # 存储文件类型映射控件
-        self.type_entries = {}
+        # 当前覆盖在单元格上的编辑框
+        self._type_editor = None
         
     def populate_file_type_mapping(self):
         """填充文件类型映射"""
-        # 清空现有控件
-        for widget in self.type_frame.winfo_children():
-            widget.destroy()
-            
-        self.type_entries.clear()
+        self.close_type_editor(commit=False)
+        rows = [(type_name, ', '.join(extensions))
+                for type_name, extensions in self.file_type_mapping.items()]
+        
+        # 重置/导入配置时类型通常不变，直接复用已有的行只更新扩展名
+        if self.type_tree.get_children() == tuple(type_name for type_name, _ in rows):
+            for type_name, extensions_str in rows:
+                self.type_tree.set(type_name, 'ext', extensions_str)
+            return
         
-        row = 0
-        for type_name, extensions in self.file_type_mapping.items():
-            # 类型名标签
-            ttk.Label(self.type_frame, text=f"{type_name}:").grid(
-                row=row, column=0, sticky=tk.W, padx=5, pady=2
-            )
-            
-            # 扩展名输入框
-            extensions_str = ', '.join(extensions)
-            entry = ttk.Entry(self.type_frame, width=60)
-            entry.insert(0, extensions_str)
-            entry.grid(row=row, column=1, sticky=(tk.W, tk.E), padx=5, pady=2)
-            
-            self.type_entries[type_name] = entry
-            self.type_frame.columnconfigure(1, weight=1)
+        self.type_tree.delete(*self.type_tree.get_children())
+        for type_name, extensions_str in rows:
+            self.type_tree.insert('', 'end', iid=type_name, text=type_name,
+                                  values=(extensions_str,))
             
-            row += 1
+    def edit_type_extensions(self, event):
+        """在双击的扩展名单元格上放置编辑框"""
+        item = self.type_tree.identify_row(event.y)
+        if not item or self.type_tree.identify_column(event.x) != '#1':
+            return
+        bbox = self.type_tree.bbox(item, 'ext')
+        if not bbox:
+            return
+        
+        self.close_type_editor(commit=True)
+        x, y, width, height = bbox
+        editor = ttk.Entry(self.type_tree)
+        editor.insert(0, self.type_tree.set(item, 'ext'))
+        editor.select_range(0, tk.END)
+        editor.place(x=x, y=y, width=width, height=height)
+        editor.focus_set()
+        
+        editor.bind("<Return>", lambda e: self.close_type_editor(commit=True))
+        editor.bind("<FocusOut>", lambda e: self.close_type_editor(commit=True))
+        editor.bind("<Escape>", lambda e: self.close_type_editor(commit=False))
+        self._type_editor = (editor, item)
+        
+    def close_type_editor(self, commit=True):
+        """关闭单元格编辑框，commit为True时写回表格"""
+        if self._type_editor is None:
+            return
+        editor, item = self._type_editor
+        self._type_editor = None
+        if commit and self.type_tree.exists(item):
+            self.type_tree.set(item, 'ext', editor.get())
+        editor.destroy()
             
-    def create_custom_rules_tab(self, notebook):
+    def create_custom_rules_tab(self, frame):
         """创建自定义规则标签页"""
-        frame = ttk.Frame(notebook)
-        notebook.add(frame, text="自定义规则")
-        
         # 说明标签
         info_label = ttk.Label(frame, 
             text="创建基于文件名模式的自定义分类规则\n"
@@ -160,19 +257,15 @@ class SettingsDialog:
         ttk.Button(btn_frame, text="切换启用", 
                   command=self.toggle_rule_enabled).pack(side=tk.LEFT, padx=5)
                   
-    def create_advanced_tab(self, notebook):
+    def create_advanced_tab(self, frame):
         """创建高级设置标签页"""
-        frame = ttk.Frame(notebook)
-        notebook.add(frame, text="高级设置")
-        
         # 标志文件设置
         flag_frame = ttk.LabelFrame(frame, text="标志文件设置", padding="10")
         flag_frame.pack(fill=tk.X, padx=10, pady=5)
         
         # 启用标志文件
-        self.respect_flag_file = tk.BooleanVar(value=True)
-        ttk.Checkbutton(flag_frame, text="启用标志文件功能", 
-                       variable=self.respect_flag_file).pack(anchor=tk.W)
+        self.respect_flag_file_cb = ttk.Checkbutton(flag_frame, text="启用标志文件功能")
+        self.respect_flag_file_cb.pack(anchor=tk.W)
         
         # 标志文件名称
         flag_name_frame = ttk.Frame(flag_frame)
@@ -206,62 +299,49 @@ class SettingsDialog:
         monitor_frame = ttk.LabelFrame(frame, text="监控设置", padding=10)
         monitor_frame.pack(fill=tk.X, padx=10, pady=5)
         
-        self.monitor_subfolders_var = tk.BooleanVar()
-        ttk.Checkbutton(monitor_frame, text="监控子文件夹", 
-                       variable=self.monitor_subfolders_var).pack(anchor=tk.W)
+        self.monitor_subfolders_cb = ttk.Checkbutton(monitor_frame, text="监控子文件夹")
+        self.monitor_subfolders_cb.pack(anchor=tk.W)
         
-        self.auto_start_monitoring_var = tk.BooleanVar()
-        ttk.Checkbutton(monitor_frame, text="启动时自动开始监控", 
-                       variable=self.auto_start_monitoring_var).pack(anchor=tk.W)
+        self.auto_start_monitoring_cb = ttk.Checkbutton(monitor_frame, text="启动时自动开始监控")
+        self.auto_start_monitoring_cb.pack(anchor=tk.W)
         
         # 监控延迟设置
         delay_frame = ttk.Frame(monitor_frame)
         delay_frame.pack(fill=tk.X, pady=5)
         
         ttk.Label(delay_frame, text="监控延迟 (秒):").pack(side=tk.LEFT)
-        self.monitor_delay_var = tk.DoubleVar()
-        delay_spin = ttk.Spinbox(delay_frame, from_=0.1, to=10.0, increment=0.1, 
-                                textvariable=self.monitor_delay_var, width=10)
-        delay_spin.pack(side=tk.LEFT, padx=5)
+        self.monitor_delay_spin = ttk.Spinbox(delay_frame, from_=0.1, to=10.0, increment=0.1, width=10)
+        self.monitor_delay_spin.pack(side=tk.LEFT, padx=5)
         
         # 性能设置
         performance_frame = ttk.LabelFrame(frame, text="性能设置", padding=10)
         performance_frame.pack(fill=tk.X, padx=10, pady=5)
         
-        self.parallel_processing_var = tk.BooleanVar()
-        ttk.Checkbutton(performance_frame, text="启用并行处理", 
-                       variable=self.parallel_processing_var).pack(anchor=tk.W)
+        self.parallel_processing_cb = ttk.Checkbutton(performance_frame, text="启用并行处理")
+        self.parallel_processing_cb.pack(anchor=tk.W)
         
         workers_frame = ttk.Frame(performance_frame)
         workers_frame.pack(fill=tk.X, pady=5)
         
         ttk.Label(workers_frame, text="最大工作线程数:").pack(side=tk.LEFT)
-        self.max_workers_var = tk.IntVar()
-        workers_spin = ttk.Spinbox(workers_frame, from_=1, to=16, 
-                                  textvariable=self.max_workers_var, width=10)
-        workers_spin.pack(side=tk.LEFT, padx=5)
+        self.max_workers_spin = ttk.Spinbox(workers_frame, from_=1, to=16, width=10)
+        self.max_workers_spin.pack(side=tk.LEFT, padx=5)
         
         # 其他设置
         other_frame = ttk.LabelFrame(frame, text="其他设置", padding=10)
         other_frame.pack(fill=tk.X, padx=10, pady=5)
         
-        self.auto_create_folders_var = tk.BooleanVar()
-        ttk.Checkbutton(other_frame, text="自动创建目标文件夹", 
-                       variable=self.auto_create_folders_var).pack(anchor=tk.W)
+        self.auto_create_folders_cb = ttk.Checkbutton(other_frame, text="自动创建目标文件夹")
+        self.auto_create_folders_cb.pack(anchor=tk.W)
         
-        self.preserve_timestamps_var = tk.BooleanVar()
-        ttk.Checkbutton(other_frame, text="保留文件时间戳", 
-                       variable=self.preserve_timestamps_var).pack(anchor=tk.W)
+        self.preserve_timestamps_cb = ttk.Checkbutton(other_frame, text="保留文件时间戳")
+        self.preserve_timestamps_cb.pack(anchor=tk.W)
         
-        self.use_recycle_bin_var = tk.BooleanVar()
-        ttk.Checkbutton(other_frame, text="删除文件时使用回收站", 
-                       variable=self.use_recycle_bin_var).pack(anchor=tk.W)
+        self.use_recycle_bin_cb = ttk.Checkbutton(other_frame, text="删除文件时使用回收站")
+        self.use_recycle_bin_cb.pack(anchor=tk.W)
         
-    def create_exclude_tab(self, notebook):
+    def create_exclude_tab(self, frame):
         """创建排除设置标签页"""
-        frame = ttk.Frame(notebook)
-        notebook.add(frame, text="排除设置")
-        
         # 说明标签
         info_label = ttk.Label(frame, text="设置要排除的文件模式和大小限制")
         info_label.pack(anchor=tk.W, padx=10, pady=5)
@@ -274,7 +354,9 @@ class SettingsDialog:
         list_frame = ttk.Frame(exclude_frame)
         list_frame.pack(fill=tk.BOTH, expand=True)
         
-        self.exclude_listbox = tk.Listbox(list_frame, height=8)
+        # 列表内容绑定到一个Tcl列表变量，整体读写只需一次调用
+        self._excl_var = tk.Variable(self.dialog, value=())
+        self.exclude_listbox = tk.Listbox(list_frame, height=8, listvariable=self._excl_var)
         exclude_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, 
                                          command=self.exclude_listbox.yview)
         self.exclude_listbox.configure(yscrollcommand=exclude_scrollbar.set)
@@ -317,66 +399,86 @@ class SettingsDialog:
     def load_settings(self):
         """加载当前设置"""
         config = self.config_manager.load_config()
+        self._config = config
+        # 打开时的配置副本，保存时只写入与之不同的设置项
+        self._orig = copy.deepcopy(config)
         
+        # 文件类型映射和自定义规则保存在普通属性中，未创建的标签页不受影响
+        self.file_type_mapping = config.get('file_type_mapping', {})
+        self.custom_rules = config.get('custom_rules', [])
+        # 规则在列表中的显示行只在加载时生成一次，之后只重算被修改的行
+        self._rule_rows = [self._rule_values(rule) for rule in self.custom_rules]
+        
+        # 只把设置推送到已经创建的标签页，其余页面在首次创建时加载
+        for key in self._built_tabs:
+            loader = self._tab_loaders.get(key)
+            if loader:
+                loader(config)
+                
+    def _load_file_type_tab(self, config):
+        """加载文件类型映射到表格"""
+        self.populate_file_type_mapping()
+        
+    def _load_custom_rules_tab(self, config):
+        """加载自定义规则到列表"""
+        self.populate_custom_rules()
+        
+    def _load_advanced_tab(self, config):
+        """加载高级设置"""
         # 加载标志文件设置
         flag_file_config = config.get('flag_file', {
             'enabled': True,
             'name': '.noclassify'
         })
-        self.respect_flag_file.set(flag_file_config.get('enabled', True))
+        _set_checked(self.respect_flag_file_cb, flag_file_config.get('enabled', True))
         self.flag_file_name.set(flag_file_config.get('name', '.noclassify'))
         
-        # 加载文件类型映射
-        self.file_type_mapping = config.get('file_type_mapping', {})
-        self.populate_file_type_mapping()
-        
-        # 加载自定义规则
-        self.custom_rules = config.get('custom_rules', [])
-        self.populate_custom_rules()
-        
-        # 加载高级设置
         self.duplicate_var.set(config.get('handle_duplicates', 'rename'))
-        self.monitor_subfolders_var.set(config.get('monitor_subfolders', True))
-        self.auto_start_monitoring_var.set(config.get('auto_start_monitoring', False))
-        self.monitor_delay_var.set(config.get('monitor_delay', 1.0))
-        self.parallel_processing_var.set(config.get('parallel_processing', True))
-        self.max_workers_var.set(config.get('max_workers', 4))
-        self.auto_create_folders_var.set(config.get('auto_create_folders', True))
-        self.preserve_timestamps_var.set(config.get('preserve_timestamps', True))
-        self.use_recycle_bin_var.set(config.get('use_recycle_bin', True))
-        
-        # 加载排除设置
-        exclude_patterns = config.get('exclude_patterns', [])
-        self.exclude_listbox.delete(0, tk.END)
-        for pattern in exclude_patterns:
-            self.exclude_listbox.insert(tk.END, pattern)
+        _set_checked(self.monitor_subfolders_cb, config.get('monitor_subfolders', True))
+        _set_checked(self.auto_start_monitoring_cb, config.get('auto_start_monitoring', False))
+        self.monitor_delay_spin.set(config.get('monitor_delay', 1.0))
+        _set_checked(self.parallel_processing_cb, config.get('parallel_processing', True))
+        self.max_workers_spin.set(config.get('max_workers', 4))
+        _set_checked(self.auto_create_folders_cb, config.get('auto_create_folders', True))
+        _set_checked(self.preserve_timestamps_cb, config.get('preserve_timestamps', True))
+        _set_checked(self.use_recycle_bin_cb, config.get('use_recycle_bin', True))
+        
+    def _load_exclude_tab(self, config):
+        """加载排除设置"""
+        self._excl_var.set(tuple(config.get('exclude_patterns', [])))
             
         self.min_file_size_var.set(config.get('min_file_size', 0))
         self.max_file_size_var.set(config.get('max_file_size', 1024*1024*1024))
         
+    @staticmethod
+    def _rule_values(rule):
+        """生成规则在列表中显示的一行"""
+        return (
+            "✓" if rule.get('enabled', True) else "✗",
+            rule.get('name', ''),
+            rule.get('pattern', ''),
+            rule.get('target_folder', ''),
+            rule.get('description', '')
+        )
+        
     def populate_custom_rules(self):
-        """填充自定义规则"""
-        # 清空现有项目
-        for item in self.rules_tree.get_children():
-            self.rules_tree.delete(item)
-            
-        # 添加规则
-        for rule in self.custom_rules:
-            enabled = "✓" if rule.get('enabled', True) else "✗"
-            self.rules_tree.insert('', 'end', values=(
-                enabled,
-                rule.get('name', ''),
-                rule.get('pattern', ''),
-                rule.get('target_folder', ''),
-                rule.get('description', '')
-            ))
+        """填充自定义规则（仅在加载设置时整表重建）"""
+        self.rules_tree.delete(*self.rules_tree.get_children())
+        
+        # 与self.custom_rules一一对应的行iid，增删改时只更新对应的行
+        self._rule_iids = [
+            self.rules_tree.insert('', 'end', values=row)
+            for row in self._rule_rows
+        ]
             
     def add_custom_rule(self):
         """添加自定义规则"""
         dialog = CustomRuleDialog(self.dialog)
         if dialog.result:
+            row = self._rule_values(dialog.result)
             self.custom_rules.append(dialog.result)
-            self.populate_custom_rules()
+            self._rule_rows.append(row)
+            self._rule_iids.append(self.rules_tree.insert('', 'end', values=row))
             
     def edit_custom_rule(self):
         """编辑自定义规则"""
@@ -386,14 +488,15 @@ class SettingsDialog:
             return
             
         item = selection[0]
-        index = self.rules_tree.index(item)
+        index = self._rule_iids.index(item)
         
         current_rule = self.custom_rules[index]
         dialog = CustomRuleDialog(self.dialog, current_rule)
         
         if dialog.result:
             self.custom_rules[index] = dialog.result
-            self.populate_custom_rules()
+            self._rule_rows[index] = self._rule_values(dialog.result)
+            self.rules_tree.item(item, values=self._rule_rows[index])
             
     def delete_custom_rule(self):
         """删除自定义规则"""
@@ -404,9 +507,11 @@ class SettingsDialog:
             
         if messagebox.askyesno("确认", "确定要删除选中的规则吗？"):
             item = selection[0]
-            index = self.rules_tree.index(item)
+            index = self._rule_iids.index(item)
             del self.custom_rules[index]
-            self.populate_custom_rules()
+            del self._rule_rows[index]
+            del self._rule_iids[index]
+            self.rules_tree.delete(item)
             
     def toggle_rule_enabled(self):
         """切换规则启用状态"""
@@ -416,11 +521,12 @@ class SettingsDialog:
             return
             
         item = selection[0]
-        index = self.rules_tree.index(item)
+        index = self._rule_iids.index(item)
         
         rule = self.custom_rules[index]
         rule['enabled'] = not rule.get('enabled', True)
-        self.populate_custom_rules()
+        self._rule_rows[index] = self._rule_values(rule)
+        self.rules_tree.set(item, '启用', self._rule_rows[index][0])
         
     def add_exclude_pattern(self):
         """添加排除模式"""
@@ -438,64 +544,74 @@ class SettingsDialog:
     def save_settings(self):
         """保存设置"""
         try:
-            config = self.config_manager.load_config()
-            
-            # 保存标志文件设置
-            config['flag_file'] = {
-                'enabled': self.respect_flag_file.get(),
-                'name': self.flag_file_name.get()
-            }
-            
-            # 保存文件类型映射
-            new_mapping = {}
-            for type_name, entry in self.type_entries.items():
-                extensions_str = entry.get().strip()
-                if extensions_str:
-                    extensions = [ext.strip() for ext in extensions_str.split(',')]
-                    # 确保扩展名以点开头
-                    extensions = [ext if ext.startswith('.') else f'.{ext}' for ext in extensions if ext]
-                    new_mapping[type_name] = extensions
-                else:
-                    new_mapping[type_name] = []
-                    
-            config['file_type_mapping'] = new_mapping
+            config = {}
+            
+            # 未创建的标签页沿用配置文件中的原值
+            if 'file_type' in self._built_tabs:
+                # 保存文件类型映射
+                self.close_type_editor(commit=True)
+                new_mapping = {}
+                for item in self.type_tree.get_children():
+                    type_name = self.type_tree.item(item, 'text')
+                    extensions_str = self.type_tree.set(item, 'ext')
+                    # 一次遍历完成去空白、去空项，并确保扩展名以点开头
+                    new_mapping[type_name] = [
+                        ext if ext.startswith('.') else f'.{ext}'
+                        for ext in map(str.strip, extensions_str.split(','))
+                        if ext
+                    ]
+                        
+                config['file_type_mapping'] = new_mapping
             
             # 保存自定义规则
             config['custom_rules'] = self.custom_rules
             
-            # 保存高级设置
-            config['handle_duplicates'] = self.duplicate_var.get()
-            config['monitor_subfolders'] = self.monitor_subfolders_var.get()
-            config['auto_start_monitoring'] = self.auto_start_monitoring_var.get()
-            config['monitor_delay'] = self.monitor_delay_var.get()
-            config['parallel_processing'] = self.parallel_processing_var.get()
-            config['max_workers'] = self.max_workers_var.get()
-            config['auto_create_folders'] = self.auto_create_folders_var.get()
-            config['preserve_timestamps'] = self.preserve_timestamps_var.get()
-            config['use_recycle_bin'] = self.use_recycle_bin_var.get()
-            
-            # 保存排除设置
-            exclude_patterns = [self.exclude_listbox.get(i) for i in range(self.exclude_listbox.size())]
-            config['exclude_patterns'] = exclude_patterns
-            config['min_file_size'] = self.min_file_size_var.get()
-            config['max_file_size'] = self.max_file_size_var.get()
-            
-            # 保存配置
-            if self.config_manager.save_config(config):
-                messagebox.showinfo("成功", "设置已保存")
-                self.dialog.destroy()
+            if 'advanced' in self._built_tabs:
+                # 保存标志文件设置
+                config['flag_file'] = {
+                    'enabled': self.respect_flag_file_cb.instate(['selected']),
+                    'name': self.flag_file_name.get()
+                }
+                
+                # 保存高级设置
+                config['handle_duplicates'] = self.duplicate_var.get()
+                config['monitor_subfolders'] = self.monitor_subfolders_cb.instate(['selected'])
+                config['auto_start_monitoring'] = self.auto_start_monitoring_cb.instate(['selected'])
+                config['monitor_delay'] = float(self.monitor_delay_spin.get())
+                config['parallel_processing'] = self.parallel_processing_cb.instate(['selected'])
+                config['max_workers'] = int(self.max_workers_spin.get())
+                config['auto_create_folders'] = self.auto_create_folders_cb.instate(['selected'])
+                config['preserve_timestamps'] = self.preserve_timestamps_cb.instate(['selected'])
+                config['use_recycle_bin'] = self.use_recycle_bin_cb.instate(['selected'])
+            
+            if 'exclude' in self._built_tabs:
+                # 保存排除设置
+                exclude_patterns = list(self.dialog.tk.splitlist(self._excl_var.get()))
+                config['exclude_patterns'] = exclude_patterns
+                config['min_file_size'] = self.min_file_size_var.get()
+                config['max_file_size'] = self.max_file_size_var.get()
+            
+            # 只保存有变化的设置项
+            changed = {key: value for key, value in config.items() if self._orig.get(key) != value}
+            if self.config_manager.patch_config(changed):
+                self.show_status('✓ 已保存')
+                self.dialog.after(1500, self.dialog.destroy)
             else:
                 messagebox.showerror("错误", "保存设置失败")
             
         except Exception as e:
             messagebox.showerror("错误", f"保存设置失败: {str(e)}")
             
+    def show_status(self, text, color='green'):
+        """在按钮栏显示操作结果"""
+        self.status_label.config(text=text, foreground=color)
+        
     def reset_settings(self):
         """重置设置"""
         if messagebox.askyesno("确认", "确定要重置所有设置到默认值吗？"):
             if self.config_manager.reset_to_default():
                 self.load_settings()
-                messagebox.showinfo("成功", "设置已重置")
+                self.show_status('✓ 设置已重置')
             else:
                 messagebox.showerror("错误", "重置设置失败")
                 
@@ -509,7 +625,7 @@ class SettingsDialog:
         
         if filename:
             if self.config_manager.export_config(filename):
-                messagebox.showinfo("成功", f"配置已导出到: {filename}")
+                self.show_status(f'✓ 配置已导出到: {os.path.basename(filename)}')
             else:
                 messagebox.showerror("错误", "导出配置失败")
                 
@@ -524,141 +640,16 @@ class SettingsDialog:
             if messagebox.askyesno("确认", "导入配置将覆盖当前设置，确定要继续吗？"):
                 if self.config_manager.import_config(filename):
                     self.load_settings()
-                    messagebox.showinfo("成功", "配置已导入")
+                    self.show_status('✓ 配置已导入')
                 else:
                     messagebox.showerror("错误", "导入配置失败")
             
     def center_dialog(self):
         """居中显示对话框"""
-        self.dialog.update_idletasks()
-        width = self.dialog.winfo_width()
-        height = self.dialog.winfo_height()
-        x = (self.dialog.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.dialog.winfo_screenheight() // 2) - (height // 2)
-        self.dialog.geometry(f'{width}x{height}+{x}+{y}')
+        _center_window(self.dialog, *self.DIALOG_SIZE)
 
-class CustomRuleDialog:
-    """自定义规则编辑对话框"""
-    
-    def __init__(self, parent, rule=None):
-        self.parent = parent
-        self.result = None
-        self.dialog = None
-        
-        self.create_dialog(rule)
-        
-    def create_dialog(self, rule):
-        """创建规则编辑对话框"""
-        self.dialog = tk.Toplevel(self.parent)
-        self.dialog.title("自定义规则")
-        self.dialog.geometry("500x350")
-        self.dialog.resizable(False, False)
-        self.dialog.transient(self.parent)
-        self.dialog.grab_set()
-        
-        main_frame = ttk.Frame(self.dialog, padding=20)
-        main_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # 规则名称
-        ttk.Label(main_frame, text="规则名称:").grid(row=0, column=0, sticky=tk.W, pady=5)
-        self.name_var = tk.StringVar(value=rule.get('name', '') if rule else '')
-        name_entry = ttk.Entry(main_frame, textvariable=self.name_var, width=40)
-        name_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
-        
-        # 模式输入
-        ttk.Label(main_frame, text="文件名模式:").grid(row=1, column=0, sticky=tk.W, pady=5)
-        self.pattern_var = tk.StringVar(value=rule.get('pattern', '') if rule else '')
-        pattern_entry = ttk.Entry(main_frame, textvariable=self.pattern_var, width=40)
-        pattern_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
-        
-        # 目标文件夹
-        ttk.Label(main_frame, text="目标文件夹:").grid(row=2, column=0, sticky=tk.W, pady=5)
-        self.folder_var = tk.StringVar(value=rule.get('target_folder', '') if rule else '')
-        folder_entry = ttk.Entry(main_frame, textvariable=self.folder_var, width=40)
-        folder_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
-        
-        # 描述
-        ttk.Label(main_frame, text="描述:").grid(row=3, column=0, sticky=tk.W, pady=5)
-        self.desc_var = tk.StringVar(value=rule.get('description', '') if rule else '')
-        desc_entry = ttk.Entry(main_frame, textvariable=self.desc_var, width=40)
-        desc_entry.grid(row=3, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
-        
-        # 启用状态
-        self.enabled_var = tk.BooleanVar(value=rule.get('enabled', True) if rule else True)
-        ttk.Checkbutton(main_frame, text="启用此规则", 
-                       variable=self.enabled_var).grid(row=4, column=1, sticky=tk.W, pady=5, padx=(10, 0))
-        
-        main_frame.columnconfigure(1, weight=1)
-        
-        # 示例说明
-        example_frame = ttk.LabelFrame(main_frame, text="模式示例", padding=10)
-        example_frame.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=10)
-        
-        examples = [
-            "*.jpg - 所有jpg文件",
-            "报告* - 以'报告'开头的文件",
-            "*_backup.* - 以'_backup'结尾的文件",
-            "???.txt - 三个字符的txt文件",
-            "*重要* - 文件名包含'重要'的文件"
-        ]
-        
-        for example in examples:
-            ttk.Label(example_frame, text=example).pack(anchor=tk.W)
-            
-        # 按钮
-        button_frame = ttk.Frame(main_frame)
-        button_frame.grid(row=6, column=0, columnspan=2, pady=20)
-        
-        ttk.Button(button_frame, text="确定", 
-                  command=self.save_rule).pack(side=tk.RIGHT, padx=5)
-        ttk.Button(button_frame, text="取消", 
-                  command=self.dialog.destroy).pack(side=tk.RIGHT, padx=5)
-                  
-        # 居中显示
-        self.center_dialog()
-        
-    def save_rule(self):
-        """保存规则"""
-        name = self.name_var.get().strip()
-        pattern = self.pattern_var.get().strip()
-        folder = self.folder_var.get().strip()
-        
-        if not name:
-            messagebox.showwarning("警告", "请输入规则名称")
-            return
-            
-        if not pattern:
-            messagebox.showwarning("警告", "请输入文件名模式")
-            return
-            
-        if not folder:
-            messagebox.showwarning("警告", "请输入目标文件夹")
-            return
-            
-        self.result = {
-            'name': name,
-            'pattern': pattern,
-            'target_folder': folder,
-            'description': self.desc_var.get().strip(),
-            'enabled': self.enabled_var.get()
-        }
-        
-        self.dialog.destroy()
-        
-    def center_dialog(self):
-        """居中显示对话框"""
-        self.dialog.update_idletasks()
-        width = self.dialog.winfo_width()
-        height = self.dialog.winfo_height()
-        x = (self.dialog.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.dialog.winfo_screenheight() // 2) - (height // 2)
-        self.dialog.geometry(f'{width}x{height}+{x}+{y}')
-    
-    def create_association_tab(self, notebook):
-        """创建文件关联配置标签页"""
-        association_frame = ttk.Frame(notebook)
-        notebook.add(association_frame, text="文件关联")
-        
+    def create_association_tab(self, association_frame):
+        """创建文件关联配置标签页"""        
         # 主框架
         main_frame = ttk.Frame(association_frame)
         main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -834,38 +825,29 @@ class CustomRuleDialog:
             return
         
         try:
-            from file_classifier_enhanced import EnhancedFileClassifier
-            enhanced_classifier = EnhancedFileClassifier()
+            # 分类器构造时会读取操作历史，多次测试复用同一实例
+            if self._enhanced_classifier is None:
+                from file_classifier_enhanced import EnhancedFileClassifier
+                self._enhanced_classifier = EnhancedFileClassifier()
             
-            associations = enhanced_classifier.preview_associations(test_folder)
+            associations = self._enhanced_classifier.preview_associations(test_folder)
             
             # 显示结果
-            result_text = (
+            parts = [
                 f"检测完成！\n\n"
                 f"总文件数: {associations['total_files']}\n"
                 f"关联组数: {associations['total_groups']}\n\n"
                 f"详细信息:\n"
-            )
+            ]
             
             for group_name, group_info in associations['groups'].items():
                 if group_name == 'individual_files':
-                    result_text += f"• 独立文件: {group_info['file_count']} 个\n"
+                    parts.append(f"• 独立文件: {group_info['file_count']} 个\n")
                 else:
-                    group_type = ""
-                    if group_name.startswith('project_'):
-                        group_type = "项目文件夹"
-                    elif group_name.startswith('program_'):
-                        group_type = "程序文件组"
-                    elif group_name.startswith('web_'):
-                        group_type = "网页文件组"
-                    elif group_name.startswith('media_'):
-                        group_type = "媒体文件组"
-                    elif group_name.startswith('samename_'):
-                        group_type = "同名文件组"
-                    
-                    result_text += f"• {group_type}: {group_info['file_count']} 个文件\n"
+                    group_type = _GROUP_TYPES.get(group_name.split('_', 1)[0], "")
+                    parts.append(f"• {group_type}: {group_info['file_count']} 个文件\n")
             
-            messagebox.showinfo("检测结果", result_text, parent=self.dialog)
+            messagebox.showinfo("检测结果", "".join(parts), parent=self.dialog)
             
         except ImportError:
             messagebox.showerror(
@@ -884,4 +866,121 @@ class CustomRuleDialog:
         self.enable_media_association.set(True)
         self.enable_samename_association.set(True)
         self.project_threshold.set(0.5)
-        messagebox.showinfo("提示", "已重置为默认设置", parent=self.dialog) 
\ No newline at end of file
+        messagebox.showinfo("提示", "已重置为默认设置", parent=self.dialog)
+
+class CustomRuleDialog:
+    """自定义规则编辑对话框"""
+    
+    __slots__ = ('parent', 'result', 'dialog', 'name_var', 'pattern_var', 'folder_var',
+                 'desc_var', 'enabled_var')
+    
+    DIALOG_SIZE = (500, 350)
+    
+    def __init__(self, parent, rule=None):
+        self.parent = parent
+        self.result = None
+        self.dialog = None
+        
+        self.create_dialog(rule)
+        
+    def create_dialog(self, rule):
+        """创建规则编辑对话框"""
+        self.dialog = tk.Toplevel(self.parent)
+        self.dialog.title("自定义规则")
+        self.dialog.geometry('%dx%d' % self.DIALOG_SIZE)
+        self.dialog.resizable(False, False)
+        self.dialog.transient(self.parent)
+        self.dialog.grab_set()
+        
+        main_frame = ttk.Frame(self.dialog, padding=20)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 规则名称
+        ttk.Label(main_frame, text="规则名称:").grid(row=0, column=0, sticky=tk.W, pady=5)
+        self.name_var = tk.StringVar(value=rule.get('name', '') if rule else '')
+        name_entry = ttk.Entry(main_frame, textvariable=self.name_var, width=40)
+        name_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
+        
+        # 模式输入
+        ttk.Label(main_frame, text="文件名模式:").grid(row=1, column=0, sticky=tk.W, pady=5)
+        self.pattern_var = tk.StringVar(value=rule.get('pattern', '') if rule else '')
+        pattern_entry = ttk.Entry(main_frame, textvariable=self.pattern_var, width=40)
+        pattern_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
+        
+        # 目标文件夹
+        ttk.Label(main_frame, text="目标文件夹:").grid(row=2, column=0, sticky=tk.W, pady=5)
+        self.folder_var = tk.StringVar(value=rule.get('target_folder', '') if rule else '')
+        folder_entry = ttk.Entry(main_frame, textvariable=self.folder_var, width=40)
+        folder_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
+        
+        # 描述
+        ttk.Label(main_frame, text="描述:").grid(row=3, column=0, sticky=tk.W, pady=5)
+        self.desc_var = tk.StringVar(value=rule.get('description', '') if rule else '')
+        desc_entry = ttk.Entry(main_frame, textvariable=self.desc_var, width=40)
+        desc_entry.grid(row=3, column=1, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
+        
+        # 启用状态
+        self.enabled_var = tk.BooleanVar(value=rule.get('enabled', True) if rule else True)
+        ttk.Checkbutton(main_frame, text="启用此规则", 
+                       variable=self.enabled_var).grid(row=4, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+        
+        main_frame.columnconfigure(1, weight=1)
+        
+        # 示例说明
+        example_frame = ttk.LabelFrame(main_frame, text="模式示例", padding=10)
+        example_frame.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=10)
+        
+        examples = [
+            "*.jpg - 所有jpg文件",
+            "报告* - 以'报告'开头的文件",
+            "*_backup.* - 以'_backup'结尾的文件",
+            "???.txt - 三个字符的txt文件",
+            "*重要* - 文件名包含'重要'的文件"
+        ]
+        
+        for example in examples:
+            ttk.Label(example_frame, text=example).pack(anchor=tk.W)
+            
+        # 按钮
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=6, column=0, columnspan=2, pady=20)
+        
+        ttk.Button(button_frame, text="确定", 
+                  command=self.save_rule).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(button_frame, text="取消", 
+                  command=self.dialog.destroy).pack(side=tk.RIGHT, padx=5)
+                  
+        # 居中显示
+        self.center_dialog()
+        
+    def save_rule(self):
+        """保存规则"""
+        name = self.name_var.get().strip()
+        pattern = self.pattern_var.get().strip()
+        folder = self.folder_var.get().strip()
+        
+        if not name:
+            messagebox.showwarning("警告", "请输入规则名称")
+            return
+            
+        if not pattern:
+            messagebox.showwarning("警告", "请输入文件名模式")
+            return
+            
+        if not folder:
+            messagebox.showwarning("警告", "请输入目标文件夹")
+            return
+            
+        self.result = {
+            'name': name,
+            'pattern': pattern,
+            'target_folder': folder,
+            'description': self.desc_var.get().strip(),
+            'enabled': self.enabled_var.get()
+        }
+        
+        self.dialog.destroy()
+        
+    def center_dialog(self):
+        """居中显示对话框"""
+        _center_window(self.dialog, *self.DIALOG_SIZE)